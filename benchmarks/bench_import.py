@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# 导入耗时与首次调用耗时基准测试
+# 用法：python benchmarks/bench_import.py [重复次数]
+# 每次测量都在新的解释器进程中进行，导入耗时取自 python -X importtime 的累计值
+
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 首次调用：签名 + 加密 + 解密，不发起网络请求
+FIRST_CALL_CODE = '''
+import base64, time
+start = time.perf_counter()
+import xunshubao
+util = xunshubao.XunshubaoZxgkUtil('appKey', 'signSecretKey', base64.b64encode(b'0123456789abcdef').decode(),
+                                   '0123456789abcdef')
+form = xunshubao.ZxgkSearchForm(requestId='bench', name='name', cardNum='cardNum')
+body = form.request_body_str()
+util.sign('%(sign_type)s', 1721898937532, body)
+util.decrypt_body('%(encryption)s', util.encrypt_body('%(encryption)s', body, form.request_template()))
+print((time.perf_counter() - start) * 1000)
+'''
+
+
+def import_time_ms(module):
+    """
+    在新进程中导入模块，返回 -X importtime 报告的累计耗时（毫秒）
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import %s' % module],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    for line in proc.stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError('importtime输出中没有找到模块 %s' % module)
+
+
+def first_call_ms(sign_type, encryption):
+    """
+    在新进程中导入并完成第一次签名和加解密，返回总耗时（毫秒）
+    """
+    code = FIRST_CALL_CODE % {'sign_type': sign_type, 'encryption': encryption}
+    proc = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(proc.stdout.strip())
+
+
+def report(name, samples):
+    print('%-24s median=%8.2fms  min=%8.2fms  max=%8.2fms' % (name, statistics.median(samples), min(samples),
+                                                               max(samples)))
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    report('import xunshubao', [import_time_ms('xunshubao') for _ in range(repeat)])
+    report('first call MD5/AES', [first_call_ms('MD5', 'AES') for _ in range(repeat)])
+    report('first call SM3/SM4', [first_call_ms('SM3', 'SM4') for _ in range(repeat)])
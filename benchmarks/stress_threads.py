@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# 多线程压力测试：64个线程共享一个XunshubaoZxgkUtil，交替调用AES（企业）和SM4（个人）接口访问本地模拟服务
+# 用法：python benchmarks/stress_threads.py [线程数] [每线程调用次数]
+# 模拟服务校验每个请求的签名并原样返回解密后的请求参数，脚本逐个核对返回报文，有任何不一致时以非零状态退出
+
+import base64
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xunshubao import XunshubaoZxgkUtil, ZxgkSearchForm  # noqa: E402
+from xunshubao.mock import MockApi, MockServer  # noqa: E402
+from xunshubao.transport import RequestsTransport  # noqa: E402
+
+KEYS = ('stressAppKey', 'stressSignSecretKey', base64.b64encode(b'0123456789abcdef').decode('utf-8'),
+        'fedcba9876543210')
+
+# （接口方法, 接口路径），企业接口为MD5/AES，个人接口为SM3/SM4
+CALLS = (
+    ('shixin_check_for_company', '/v3/shixincheck/company'),
+    ('shixin_check_for_person', '/v3/shixincheck/person'),
+    ('zxgk_query_for_company', '/v3/zxgkquery/company'),
+    ('zxgk_query_for_person', '/v3/zxgkquery/person'),
+)
+
+
+class LocalTransport(RequestsTransport):
+    """
+    默认传输层，把请求地址的协议和主机替换为本地模拟服务
+    """
+
+    def __init__(self, base_url, pool_maxsize):
+        super().__init__(pool_maxsize)
+        self.base_url = base_url
+
+    def post(self, url, data, headers, timeout):
+        return super().post(self.base_url + urlsplit(url).path, data, headers, timeout)
+
+
+def call(util, thread_no, calls):
+    """
+    一个线程的调用序列
+    :return: 不一致的调用说明列表
+    """
+    errors = []
+    for i in range(calls):
+        method, path = CALLS[(thread_no + i) % len(CALLS)]
+        name = '压测对象-%d-%d' % (thread_no, i)
+        form = ZxgkSearchForm(requestId='stress-%d-%d' % (thread_no, i), name=name, cardNum=str(i), pageNo=i % 3 + 1)
+        code, msg, result = getattr(util, method)(form)
+        if code != '0000':
+            errors.append('%s %s：code=%s msg=%s' % (method, name, code, msg))
+            continue
+        echoed = json.loads(result)
+        expected = json.loads(form.request_body_str())
+        if echoed != {'path': path, 'body': expected}:
+            errors.append('%s %s：返回报文不一致 %s' % (method, name, result))
+    return errors
+
+
+def main(threads=64, calls=50):
+    with MockServer(MockApi(*KEYS)) as server:
+        util = XunshubaoZxgkUtil(*KEYS, transport=LocalTransport(server.base_url, threads))
+        start = time.perf_counter()
+        # 所有线程就绪后同时开始，尽量让调用交错
+        barrier = threading.Barrier(threads)
+
+        def run(thread_no):
+            barrier.wait()
+            return call(util, thread_no, calls)
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            errors = [error for errors in executor.map(run, range(threads)) for error in errors]
+        elapsed = time.perf_counter() - start
+        stats = util.stats()
+        util.close()
+
+    total = threads * calls
+    print('%d个线程，%d次调用，耗时%.2f秒，%.0f次/秒' % (threads, total, elapsed, total / elapsed))
+    print('调用计数：%s' % stats)
+    if stats != {'requests': total, 'success': total, 'failure': 0, 'error': 0}:
+        errors.append('调用计数不一致：%s' % stats)
+    for error in errors[:20]:
+        print(error, file=sys.stderr)
+    if errors:
+        print('失败：%d处不一致' % len(errors), file=sys.stderr)
+        return 1
+    print('通过：所有签名校验通过，解密后的报文与请求一致')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:3])))
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# SM4与批量加解密测试：各实现与标准测试向量、gmssl逐字节一致，批量接口与逐条接口结果一致
+
+import base64
+import os
+import random
+
+import pytest
+from gmssl.sm4 import CryptSM4, SM4_ENCRYPT, SM4_DECRYPT
+
+from xunshubao import XunshubaoZxgkUtil
+from xunshubao.bulk import Sm4Ecb, pkcs7_pad, pkcs7_unpad, sm3_hexdigests
+
+KEYS = ('testAppKey', 'testSignSecretKey', base64.b64encode(b'0123456789abcdef').decode('utf-8'),
+        'fedcba9876543210')
+
+
+def available_backends():
+    backends = ['python']
+    try:
+        import numpy  # noqa: F401
+        backends.append('numpy')
+    except ImportError:
+        pass
+    if Sm4Ecb._detect_backend() == 'openssl':
+        backends.append('openssl')
+    return backends
+
+
+BACKENDS = available_backends()
+
+
+def gmssl_ecb(key, data, mode):
+    crypt = CryptSM4()
+    crypt.set_key(key, mode)
+    return crypt.crypt_ecb(data)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_standard_vector(backend):
+    # GB/T 32907-2016 附录A 示例1
+    key = bytes.fromhex('0123456789abcdeffedcba9876543210')
+    expected = bytes.fromhex('681edf34d206965e86b3e94f536e4246')
+    sm4 = Sm4Ecb(key, backend)
+    # NumPy实现只在分组数较多时使用，重复足够多的分组以覆盖向量化路径
+    assert sm4.encrypt(key * 100) == expected * 100
+    assert sm4.decrypt(expected * 100) == key * 100
+    assert sm4.encrypt(key) == expected
+    assert sm4.decrypt(expected) == key
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_matches_gmssl_on_random_data(backend):
+    rng = random.Random(backend)
+    for _ in range(50):
+        key = bytes(rng.getrandbits(8) for _ in range(16))
+        data = bytes(rng.getrandbits(8) for _ in range(rng.choice((0, 1, 15, 16, 17, 200, 1500))))
+        sm4 = Sm4Ecb(key, backend)
+        ciphertext = sm4.encrypt(pkcs7_pad(data))
+        assert ciphertext == gmssl_ecb(key, data, SM4_ENCRYPT)
+        assert pkcs7_unpad(sm4.decrypt(ciphertext)) == data
+        assert gmssl_ecb(key, ciphertext, SM4_DECRYPT) == data
+
+
+def test_rejects_partial_block():
+    with pytest.raises(ValueError):
+        Sm4Ecb(b'0123456789abcdef', 'python').encrypt(b'x' * 17)
+
+
+@pytest.mark.parametrize('encryption', ('AES', 'SM4'))
+def test_bulk_matches_single_calls(encryption):
+    util = XunshubaoZxgkUtil(*KEYS)
+    txts = ['{"name": "测试%d", "cardNum": "%s"}' % (i, 'x' * (i % 40)) for i in range(300)]
+    ciphertexts = util.encrypt_many(encryption, txts)
+    assert ciphertexts == [util.encrypt_body(encryption, txt) for txt in txts]
+    assert util.decrypt_many(encryption, ciphertexts) == txts
+    assert [util.decrypt_body(encryption, ciphertext) for ciphertext in ciphertexts] == txts
+
+
+@pytest.mark.parametrize('encryption', ('AES', 'SM4'))
+def test_decrypt_many_rejects_misaligned_item(encryption):
+    util = XunshubaoZxgkUtil(*KEYS)
+    items = [base64.b64decode(ciphertext) for ciphertext in util.encrypt_many(encryption, ['a', 'b', 'c'])]
+    # 第1条少一个字节、第2条多一个字节，拼接后总长度仍是分组长度的整数倍
+    items[1], items[2] = items[1][:-1], items[2] + b'\x00'
+    with pytest.raises(ValueError, match='第1条'):
+        util.decrypt_many(encryption, [base64.b64encode(item).decode('utf-8') for item in items])
+
+
+def test_sm3_matches_gmssl():
+    from gmssl.sm3 import sm3_hash
+    texts = ['', 'abc', '11010119900307' + os.urandom(4).hex(), '中文']
+    assert sm3_hexdigests(texts) == [sm3_hash(list(text.encode('utf-8'))) for text in texts]
+    # GB/T 32905-2016 附录A 示例1
+    assert sm3_hexdigests(['abc'])[0] == '66c7f0f462eeedd9d1f2d46bdc10e4e24167c4875cf2f7a2297da02b8f4ba8e0'
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# 流式解密测试：转义斜杠和记录在任意位置被分块截断时，逐条产出的记录和meta与整体解密的结果一致
+
+import base64
+import json
+import random
+
+import pytest
+
+from xunshubao import XunshubaoZxgkUtil, ZxgkSearchForm, MockApi, MockTransport
+from xunshubao.stream import Base64StreamDecoder, JsonRecordParser
+from xunshubao.transport import TransportStreamResponse
+
+KEYS = ('testAppKey', 'testSignSecretKey', base64.b64encode(b'0123456789abcdef').decode('utf-8'),
+        'fedcba9876543210')
+
+# 企业接口为MD5/AES，个人接口为SM3/SM4
+METHODS = ('zxgk_query_for_company', 'zxgk_query_for_person')
+
+
+class RandomChunkTransport(MockTransport):
+    """
+    模拟传输层：响应中的“/”全部转义为“\\/”，流式读取时按随机长度分块
+    """
+
+    def __init__(self, handler, seed):
+        super().__init__(handler)
+        self._random = random.Random(seed)
+
+    def post(self, url, data, headers, timeout):
+        resp = super().post(url, data, headers, timeout)
+        resp.content = resp.content.replace(b'/', b'\\/')
+        return resp
+
+    def post_stream(self, url, data, headers, timeout, chunk_size):
+        content = self.post(url, data, headers, timeout).content
+        chunks = []
+        start = 0
+        while start < len(content):
+            end = start + self._random.randint(1, 40)
+            chunks.append(content[start:end])
+            start = end
+        return TransportStreamResponse(200, iter(chunks))
+
+
+def make_util(data, seed=0):
+    api = MockApi(*KEYS, responder=lambda path, req_body: ('0000', '', data))
+    return XunshubaoZxgkUtil(*KEYS, transport=RandomChunkTransport(api, seed))
+
+
+def make_data(rng, count):
+    records = [{'dataId': 'id/%d' % i, 'caseCode': '（2024）京01执%d号' % i, 'amount': rng.random(),
+                'tags': ['a/b', {'nested': [i, '}]"\\']}]} for i in range(count)]
+    return {'total': count, 'list': records, 'pageNo': 1}
+
+
+def test_base64_escape_split_across_chunks():
+    decoder = Base64StreamDecoder()
+    assert decoder.feed('\\') == b''
+    assert decoder.feed('/AAAAAAA') == base64.b64decode('/AAAAAAA')
+    decoder.finish()
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_stream_matches_full_decrypt(method):
+    rng = random.Random(method)
+    for seed in range(200):
+        data = make_data(rng, rng.randint(0, 30))
+        util = make_util(data, seed)
+        code, msg, stream = getattr(util, method)(ZxgkSearchForm(requestId='r%d' % seed, name='名/称'), stream=True)
+        assert code == '0000'
+        assert list(stream) == data['list']
+        assert stream.meta == {'total': data['total'], 'list': [], 'pageNo': 1}
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_records_key_selects_array(method):
+    data = {'tags': ['x/y'], 'list': [{'dataId': 1}, {'dataId': 2}], 'total': 2}
+    util = make_util(data, 1)
+    code, msg, stream = getattr(util, method)(ZxgkSearchForm(requestId='r', name='n'), stream=True,
+                                              records_key='list')
+    assert code == '0000'
+    assert list(stream) == data['list']
+    assert stream.meta == {'tags': ['x/y'], 'list': [], 'total': 2}
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_stream_and_plain_results_agree(method):
+    data = make_data(random.Random(7), 50)
+    util = make_util(data, 7)
+    form = ZxgkSearchForm(requestId='r', name='n')
+    code, msg, result = getattr(util, method)(form)
+    assert json.loads(result) == data
+    code, msg, stream = getattr(util, method)(form, stream=True)
+    assert list(stream) == data['list']
+
+
+def test_parser_top_level_array_split_everywhere():
+    records = [{'a': '}{', 'b': [1, 2]}, 'text,"]', 3, None]
+    text = json.dumps(records)
+    for split in range(len(text) + 1):
+        parser = JsonRecordParser()
+        parsed = parser.feed(text[:split]) + parser.feed(text[split:])
+        parser.finish()
+        assert parsed == records
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# 循数宝V3版API接口调用客户端
+
+from .adaptive import AdaptiveController
+from .batch import BatchExecutor, SharedRateLimiter
+from .changes import ChangeEvent, ChangeTracker
+from .client import XunshubaoZxgkUtil
+from .clock import ServerClock
+from .form import ZxgkSearchForm, ZxgkRequestTemplate
+from .hedge import HedgePolicy
+from .mock import MockApi, MockServer
+from .negative import NegativeResultFilter
+from .pool import XunshubaoCredential, XunshubaoZxgkPool, RateLimiter
+from .profile import PhaseProfiler, ProfilingTransport
+from .scheduler import PriorityClass, RequestScheduler
+from .spool import Spool, SpoolReader
+from .stream import DecryptedRecordStream
+from .transport import (Transport, TransportResponse, TransportStreamResponse, RequestsTransport, Urllib3Transport,
+                        AsyncTransport, MockTransport)
+
+__version__ = '3.0.0'
+
+__all__ = [
+    'AdaptiveController',
+    'BatchExecutor',
+    'SharedRateLimiter',
+    'ChangeEvent',
+    'ChangeTracker',
+    'XunshubaoZxgkUtil',
+    'ServerClock',
+    'ZxgkSearchForm',
+    'ZxgkRequestTemplate',
+    'HedgePolicy',
+    'DecryptedRecordStream',
+    'Spool',
+    'SpoolReader',
+    'MockApi',
+    'MockServer',
+    'NegativeResultFilter',
+    'PhaseProfiler',
+    'ProfilingTransport',
+    'XunshubaoCredential',
+    'XunshubaoZxgkPool',
+    'RateLimiter',
+    'PriorityClass',
+    'RequestScheduler',
+    'Transport',
+    'TransportResponse',
+    'TransportStreamResponse',
+    'RequestsTransport',
+    'Urllib3Transport',
+    'AsyncTransport',
+    'MockTransport',
+]
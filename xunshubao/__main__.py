@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# 命令行工具
+# 用法：python -m xunshubao profile --method shixin_check_for_company --name 某某公司 -n 200 --mock
+# 访问真实接口时通过参数或环境变量 XUNSHUBAO_APP_KEY、XUNSHUBAO_SIGN_SECRET_KEY、XUNSHUBAO_SM4_SECRET_KEY、
+# XUNSHUBAO_AES_SECRET_KEY 提供密钥
+
+import argparse
+import base64
+import os
+import sys
+import uuid
+
+from .client import XunshubaoZxgkUtil, ENDPOINT_METHODS
+from .form import ZxgkSearchForm
+from .mock import MockApi, MockServer
+from .profile import PhaseProfiler, ProfilingTransport, run_profile
+
+# --mock 时模拟服务和客户端共用的密钥
+_MOCK_KEYS = ('mockAppKey', 'mockSignSecretKey', base64.b64encode(b'0123456789abcdef').decode('utf-8'),
+              '0123456789abcdef')
+
+
+def _profile(args):
+    profiler = PhaseProfiler()
+    server = None
+    base_url = args.base_url
+    if args.mock:
+        keys = _MOCK_KEYS
+        server = MockServer(MockApi(*keys))
+        base_url = server.base_url
+    else:
+        keys = (args.app_key or os.environ.get('XUNSHUBAO_APP_KEY', ''),
+                args.sign_secret_key or os.environ.get('XUNSHUBAO_SIGN_SECRET_KEY', ''),
+                args.sm4_secret_key or os.environ.get('XUNSHUBAO_SM4_SECRET_KEY', ''),
+                args.aes_secret_key or os.environ.get('XUNSHUBAO_AES_SECRET_KEY', ''))
+        if not all(keys):
+            print('缺少密钥：请通过参数或环境变量提供，或使用 --mock 访问本地模拟服务', file=sys.stderr)
+            return 2
+
+    util = XunshubaoZxgkUtil(*keys, transport=ProfilingTransport(profiler, base_url, args.reuse_connections))
+    util.timeout = args.timeout
+    util.profiler = profiler
+
+    def make_args():
+        # 每次调用使用新的requestId
+        if args.method == 'sifa_data_info':
+            return [uuid.uuid4().hex, args.data_type, args.data_id]
+        return [ZxgkSearchForm(requestId=uuid.uuid4().hex, name=args.name, cardNum=args.card_num,
+                               pageSize=args.page_size)]
+
+    try:
+        codes = run_profile(util, args.method, make_args, args.number, args.concurrency)
+    finally:
+        if server is not None:
+            server.close()
+
+    profiler.write_report(args.output)
+    print('返回码：%s' % ', '.join('%s×%d' % item for item in sorted(codes.items())))
+    for api_name, phases in profiler.percentiles().items():
+        print(api_name)
+        for path, values in phases.items():
+            print('  %-20s %s' % (path, '  '.join('%s=%.3fms' % item for item in values.items())))
+    print('分位数：%s.json，折叠栈：%s.folded' % (args.output, args.output))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m xunshubao')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    profile = subparsers.add_parser('profile', help='分阶段剖析接口调用延迟')
+    profile.add_argument('--method', required=True, choices=ENDPOINT_METHODS, help='接口方法名')
+    profile.add_argument('-n', '--number', type=int, default=100, help='调用次数')
+    profile.add_argument('-c', '--concurrency', type=int, default=1, help='并发线程数')
+    profile.add_argument('--name', default='', help='姓名或企业名称')
+    profile.add_argument('--card-num', default='', help='身份证号')
+    profile.add_argument('--page-size', type=int, default=10, help='每页记录数')
+    profile.add_argument('--data-type', default='', help='sifa_data_info的数据类型')
+    profile.add_argument('--data-id', default='', help='sifa_data_info的数据ID')
+    profile.add_argument('--mock', action='store_true', help='访问本地模拟服务')
+    profile.add_argument('--base-url', help='替换请求地址的协议和主机，如 http://127.0.0.1:8080')
+    profile.add_argument('--reuse-connections', action='store_true', help='线程内复用连接（不再测量DNS和TLS）')
+    profile.add_argument('--timeout', type=float, default=5, help='超时时间（秒）')
+    profile.add_argument('--output', default='xunshubao-profile', help='输出文件前缀')
+    profile.add_argument('--app-key')
+    profile.add_argument('--sign-secret-key')
+    profile.add_argument('--sm4-secret-key')
+    profile.add_argument('--aes-secret-key')
+    profile.set_defaults(handler=_profile)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
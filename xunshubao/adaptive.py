@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+# 自适应超时与并发控制：按接口统计延迟分布设置超时，并用AIMD（加性增、乘性减）调整各接口的并发上限
+
+import threading
+import time
+from collections import deque
+
+
+class _EndpointState:
+    """
+    接口的延迟样本、并发上限和计数
+    """
+
+    def __init__(self, window, initial_concurrency):
+        self.latencies = deque(maxlen=window)
+        self.sorted_latencies = []
+        self.samples_since_sort = 0
+        self.limit = float(initial_concurrency)
+        self.inflight = 0
+        self.last_decrease = 0.0
+        self.stats = {'requests': 0, 'errors': 0, 'slow': 0, 'decreases': 0, 'waits': 0}
+
+
+class AdaptiveController:
+    """
+    自适应控制器，设置为XunshubaoZxgkUtil.adaptive后作用于所有接口方法
+    超时：样本足够后取近期延迟的percentile分位数乘以timeout_factor，限制在[min_timeout, max_timeout]内。
+    并发：每个成功请求使上限增加1/上限（约每轮并发增加1）；请求异常、返回overload_codes中的错误代码，
+    或延迟超过近期中位数的latency_tolerance倍时，上限乘以backoff，同一轮往返时间内最多减少一次。
+    达到上限的请求排队等待。
+    流式调用（stream=True）在DecryptedRecordStream读完或关闭时才归还名额，记录的延迟包含下载时间，
+    调用方须读完或关闭返回的结果，否则名额不会归还。
+    """
+
+    def __init__(self, percentile=99, timeout_factor=2.0, min_timeout=0.5, max_timeout=30.0, min_samples=20,
+                 window=1000, initial_concurrency=4, min_concurrency=1, max_concurrency=64, backoff=0.7,
+                 latency_tolerance=3.0, overload_codes=()):
+        """
+        :param percentile: 计算超时使用的延迟分位数
+        :param timeout_factor: 超时为分位数延迟的倍数
+        :param min_timeout: 超时下限（秒）
+        :param max_timeout: 超时上限（秒）
+        :param min_samples: 使用分位数超时前所需的最少样本数，不足时使用客户端的timeout
+        :param window: 每个接口保留的最近延迟样本数
+        :param initial_concurrency: 初始并发上限
+        :param min_concurrency: 并发上限的下限
+        :param max_concurrency: 并发上限的上限
+        :param backoff: 拥塞时并发上限的缩减比例
+        :param latency_tolerance: 延迟超过近期中位数的多少倍视为拥塞
+        :param overload_codes: 表示上游过载或限流的错误代码，视为拥塞
+        """
+        self.percentile = percentile
+        self.timeout_factor = timeout_factor
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_samples = min_samples
+        self.window = window
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.overload_codes = frozenset(overload_codes)
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._endpoints = {}
+
+    def _state(self, url):
+        state = self._endpoints.get(url)
+        if state is None:
+            state = self._endpoints[url] = _EndpointState(self.window, self.initial_concurrency)
+        return state
+
+    @staticmethod
+    def _quantile(sorted_latencies, percentile):
+        return sorted_latencies[min(len(sorted_latencies) - 1, int(len(sorted_latencies) * percentile / 100))]
+
+    def _timeout(self, state, default_timeout):
+        """
+        接口当前的超时，调用方需持有锁
+        """
+        if len(state.sorted_latencies) < self.min_samples:
+            return default_timeout
+        timeout = self._quantile(state.sorted_latencies, self.percentile) * self.timeout_factor
+        return min(self.max_timeout, max(self.min_timeout, timeout))
+
+    def acquire(self, url, default_timeout):
+        """
+        等待接口的并发名额
+        :param url: 请求地址
+        :param default_timeout: 样本不足时使用的超时（秒）
+        :return: 本次请求使用的超时（秒）
+        """
+        with self._cond:
+            state = self._state(url)
+            if state.inflight >= int(state.limit):
+                state.stats['waits'] += 1
+                while state.inflight >= int(state.limit):
+                    self._cond.wait()
+            state.inflight += 1
+            state.stats['requests'] += 1
+            return self._timeout(state, default_timeout)
+
+    def release(self, url, seconds, code):
+        """
+        归还并发名额，记录延迟并调整并发上限
+        :param url: 请求地址
+        :param seconds: 耗时（秒）
+        :param code: 返回代码
+        """
+        with self._cond:
+            state = self._state(url)
+            state.inflight -= 1
+            now = time.monotonic()
+            median = self._quantile(state.sorted_latencies, 50) if state.sorted_latencies else None
+            congested = code == '9999' or code in self.overload_codes
+            if congested:
+                state.stats['errors'] += 1
+            elif median is not None and len(state.sorted_latencies) >= self.min_samples \
+                    and seconds > median * self.latency_tolerance:
+                state.stats['slow'] += 1
+                congested = True
+            if code != '9999':
+                # 请求异常（含超时）的耗时不反映接口的真实延迟，不计入样本
+                state.latencies.append(seconds)
+                state.samples_since_sort += 1
+                # 每积累一定数量的新样本重新排序一次
+                if state.samples_since_sort >= max(1, len(state.latencies) // 20) \
+                        or len(state.sorted_latencies) < self.min_samples:
+                    state.sorted_latencies = sorted(state.latencies)
+                    state.samples_since_sort = 0
+
+            if congested:
+                # 同一轮往返时间内的多次拥塞信号只减少一次
+                if now - state.last_decrease > (median or seconds):
+                    state.limit = max(self.min_concurrency, state.limit * self.backoff)
+                    state.last_decrease = now
+                    state.stats['decreases'] += 1
+            else:
+                state.limit = min(self.max_concurrency, state.limit + 1.0 / state.limit)
+            self._cond.notify_all()
+
+    def stats(self, default_timeout=None):
+        """
+        各接口的当前设置和计数
+        :param default_timeout: 样本不足时显示的超时
+        :return: 以请求地址为键的字典：timeout、concurrency、inflight、p50/p99延迟（秒）和计数
+        """
+        with self._lock:
+            report = {}
+            for url, state in self._endpoints.items():
+                latencies = state.sorted_latencies
+                report[url] = dict(
+                    state.stats,
+                    timeout=self._timeout(state, default_timeout),
+                    concurrency=int(state.limit),
+                    inflight=state.inflight,
+                    p50=self._quantile(latencies, 50) if latencies else None,
+                    p99=self._quantile(latencies, 99) if latencies else None)
+            return report
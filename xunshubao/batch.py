@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+# 多进程批量执行：把查询表单分片交给进程池，各进程持有自己的客户端，签名、加解密和JSON处理不再受GIL限制
+
+import itertools
+import os
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .client import XunshubaoZxgkUtil, ENDPOINT_METHODS
+
+# multiprocessing和进程池在创建实例时才导入，不使用批量执行的调用方不必承担其导入耗时
+
+
+class SharedRateLimiter:
+    """
+    跨进程共享的令牌桶限速器，所有工作进程共用一份请求预算
+    """
+
+    def __init__(self, rate, burst=None, mp_context=None):
+        """
+        :param rate: 每秒补充的令牌数
+        :param burst: 令牌桶容量，为空时等于rate
+        :param mp_context: multiprocessing上下文，需与进程池一致
+        """
+        import multiprocessing
+        ctx = mp_context if mp_context is not None else multiprocessing.get_context()
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(rate, 1)
+        self._lock = ctx.Lock()
+        self._tokens = ctx.RawValue('d', self.capacity)
+        # time.monotonic()是系统范围的时钟，各进程读数可以直接比较
+        self._updated = ctx.RawValue('d', time.monotonic())
+
+    def acquire(self):
+        """
+        取一个令牌，不足时等待
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens = min(self.capacity, self._tokens.value + (now - self._updated.value) * self.rate)
+                self._updated.value = now
+                if tokens >= 1:
+                    self._tokens.value = tokens - 1
+                    return
+                self._tokens.value = tokens
+                wait_seconds = (1 - tokens) / self.rate
+            time.sleep(wait_seconds)
+
+
+class _BatchWorker:
+    """
+    工作进程内的状态：客户端、线程池、共享限速器和计数
+    """
+
+    def __init__(self, client_args, transport_factory, limiter, threads, spool_dir=None):
+        transport = transport_factory() if transport_factory is not None else None
+        self.util = XunshubaoZxgkUtil(*client_args, pool_maxsize=threads, transport=transport)
+        if spool_dir is not None:
+            # 同一目录只能由一个Spool写入，每个工作进程使用以进程号命名的子目录
+            from multiprocessing.util import Finalize
+            from .spool import Spool
+            self.util.spool = Spool(os.path.join(spool_dir, str(os.getpid())))
+            # 工作进程退出时同步并关闭
+            Finalize(self.util.spool, self.util.spool.close, exitpriority=10)
+        self.limiter = limiter
+        self.threads = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='xunshubao-batch')
+        self.chunks = 0
+        self.busy_seconds = 0.0
+
+    def call(self, method, item, kwargs):
+        if self.limiter is not None:
+            self.limiter.acquire()
+        args = item if isinstance(item, tuple) else (item,)
+        return getattr(self.util, method)(*args, **kwargs)
+
+    def run(self, method, chunk, kwargs):
+        start = time.perf_counter()
+        futures = [(index, self.threads.submit(self.call, method, item, kwargs)) for index, item in chunk]
+        results = [(index, future.result()) for index, future in futures]
+        if self.util.spool is not None:
+            # 分片结果交给主进程之前先落盘
+            self.util.spool.sync()
+        self.chunks += 1
+        self.busy_seconds += time.perf_counter() - start
+        stats = dict(self.util.stats(), chunks=self.chunks, busy_seconds=self.busy_seconds)
+        return os.getpid(), results, stats
+
+
+# 工作进程中的_BatchWorker实例
+_worker = None
+
+
+def _init_worker(client_args, transport_factory, limiter, threads, spool_dir):
+    global _worker
+    # 中断信号由主进程处理，工作进程随进程池一起有序退出
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker = _BatchWorker(client_args, transport_factory, limiter, threads, spool_dir)
+
+
+def _run_chunk(method, chunk, kwargs):
+    return _worker.run(method, chunk, kwargs)
+
+
+class BatchExecutor:
+    """
+    多进程批量执行器
+    输入的查询表单按chunk_size分片提交给进程池，每个工作进程持有一个客户端，并用线程池并发发出请求；
+    所有工作进程共享同一个限速预算。结果可以按输入顺序或按完成顺序返回。
+    """
+
+    def __init__(self, appKey, signSecretKey, sm4SecretKey, aesSecretKey, processes=None, threads_per_worker=8,
+                 chunk_size=32, rate=None, burst=None, transport_factory=None, max_pending=None, mp_context=None,
+                 spool_dir=None):
+        """
+        :param appKey: 用户标识
+        :param signSecretKey: 签名密钥
+        :param sm4SecretKey: SM4密钥
+        :param aesSecretKey: AES密钥
+        :param processes: 工作进程数，为空时等于CPU核数
+        :param threads_per_worker: 每个工作进程的并发请求数
+        :param chunk_size: 每个分片包含的请求数
+        :param rate: 所有进程合计每秒最多请求数，为空时不限速
+        :param burst: 限速令牌桶容量，为空时等于rate
+        :param transport_factory: 在工作进程中创建传输层的函数（需可pickle），为空时使用默认传输层
+        :param max_pending: 同时在途的分片数上限，为空时为进程数的4倍，避免一次读入全部输入
+        :param mp_context: multiprocessing上下文
+        :param spool_dir: 请求/应答落盘目录，为空时不落盘；每个工作进程写入其中以进程号命名的子目录，
+                          批量任务中断后可用SpoolReader逐个读取各子目录，取回已付费的结果
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending or self.processes * 4
+        self.limiter = SharedRateLimiter(rate, burst, mp_context) if rate else None
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes, mp_context=mp_context, initializer=_init_worker,
+            initargs=((appKey, signSecretKey, sm4SecretKey, aesSecretKey), transport_factory, self.limiter,
+                      threads_per_worker, spool_dir))
+        self._stats_lock = threading.Lock()
+        self._worker_stats = {}
+        # 已提交未取回的分片，关闭时可取消
+        self._inflight = set()
+
+    def map(self, method, items, ordered=True, **kwargs):
+        """
+        批量调用接口方法
+        :param method: 接口方法名，如shixin_check_for_person
+        :param items: 查询表单的可迭代对象；sifa_data_info等多参数接口传入参数元组
+        :param ordered: True按输入顺序返回，False按完成顺序返回
+        :param kwargs: 传给接口方法的其他参数（不支持stream）
+        :return: 生成器，逐个产出元组（输入序号, (code, msg, result)）
+        """
+        if method not in ENDPOINT_METHODS:
+            raise ValueError('未知的接口方法：%s' % method)
+        if kwargs.get('stream'):
+            raise ValueError('流式结果无法跨进程返回')
+        items = enumerate(items)
+        pending = deque()
+
+        def submit_next():
+            chunk = list(itertools.islice(items, self.chunk_size))
+            if chunk:
+                future = self._executor.submit(_run_chunk, method, chunk, kwargs)
+                self._inflight.add(future)
+                pending.append(future)
+            return bool(chunk)
+
+        try:
+            while len(pending) < self.max_pending and submit_next():
+                pass
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                for future in done:
+                    self._inflight.discard(future)
+                    pid, results, stats = future.result()
+                    with self._stats_lock:
+                        self._worker_stats[pid] = stats
+                    submit_next()
+                    for pair in results:
+                        yield pair
+        finally:
+            # 调用方中途退出或出现异常时，取消尚未开始的分片
+            for future in pending:
+                future.cancel()
+                self._inflight.discard(future)
+
+    def stats(self):
+        """
+        各工作进程的计数：请求数、成功/失败/异常数、完成的分片数和累计忙碌时间
+        :return: 以进程号为键的字典
+        """
+        with self._stats_lock:
+            return {pid: dict(stats) for pid, stats in self._worker_stats.items()}
+
+    def shutdown(self, wait=True, cancel_pending=False):
+        """
+        关闭进程池
+        :param wait: 是否等待在途的分片完成
+        :param cancel_pending: 是否取消尚未开始的分片
+        """
+        if cancel_pending:
+            for future in list(self._inflight):
+                future.cancel()
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # 异常退出时不再执行排队中的分片
+        self.shutdown(wait=True, cancel_pending=exc_type is not None)
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+# 变化检测：为每条记录计算内容指纹并保存在本地SQLite库中，与上次筛查的结果比较，只输出新增、变更、移除事件
+# 下游处理量与变化量相关，与被筛查的对象总数无关
+
+import hashlib
+import json
+import threading
+import time
+
+from .stream import DecryptedRecordStream
+
+ADDED = 'add'
+UPDATED = 'update'
+REMOVED = 'remove'
+
+
+class ChangeEvent:
+    """
+    变化事件
+    """
+
+    def __init__(self, kind, subject, data_id, record=None):
+        """
+        :param kind: add/update/remove
+        :param subject: 查询对象
+        :param data_id: 记录ID
+        :param record: 新增或变更后的记录，移除时为空
+        """
+        self.kind = kind
+        self.subject = subject
+        self.data_id = data_id
+        self.record = record
+
+    def to_dict(self):
+        event = {'kind': self.kind, 'subject': self.subject, 'dataId': self.data_id}
+        if self.record is not None:
+            event['record'] = self.record
+        return event
+
+    def __repr__(self):
+        return 'ChangeEvent(%s, %s, %s)' % (self.kind, self.subject, self.data_id)
+
+
+def query_all_records(util, method, search_form, records_key=None, max_pages=100):
+    """
+    逐页调用查询接口，取得查询对象的完整记录列表
+    从第1页开始翻页，某页记录数少于pageSize时结束；第2页起requestId加上“-页码”后缀。
+    查询表单的pageNo和requestId在返回前恢复原值。
+    :param util: XunshubaoZxgkUtil
+    :param method: 查询接口方法名，如zxgk_query_for_person
+    :param search_form: 查询条件
+    :param records_key: 记录数组的键名，为空时取第一个数组成员
+    :param max_pages: 最多查询的页数
+    :return: 元组（code, msg, records），任一页失败或页数超过max_pages时records为空
+    """
+    page_no, request_id = search_form.pageNo, search_form.requestId
+    records = []
+    try:
+        for page in range(1, max_pages + 1):
+            search_form.pageNo = page
+            search_form.requestId = request_id if page == 1 else '%s-%d' % (request_id, page)
+            code, msg, result = getattr(util, method)(search_form)
+            if code != '0000' or result is None:
+                return code, msg, None
+            page_records = extract_records(result, records_key)
+            records.extend(page_records)
+            if len(page_records) < search_form.pageSize:
+                return code, msg, records
+        return '9999', '分页数超过%d页' % max_pages, None
+    finally:
+        search_form.pageNo, search_form.requestId = page_no, request_id
+
+
+def extract_records(result, records_key=None):
+    """
+    从解密后的查询结果中取出记录列表
+    :param result: 解密后的返回报文（JSON字符串）、已解析的对象或DecryptedRecordStream
+    :param records_key: 记录数组的键名，为空时取第一个数组成员（与流式模式一致）
+    :return: 记录列表，流式结果原样返回
+    """
+    if isinstance(result, DecryptedRecordStream):
+        return result
+    data = json.loads(result) if isinstance(result, str) else result
+    if data is None:
+        return []
+    if isinstance(data, list):
+        return data
+    if records_key is not None:
+        return data.get(records_key) or []
+    for value in data.values():
+        if isinstance(value, list):
+            return value
+    return []
+
+
+class ChangeTracker:
+    """
+    筛查结果变化跟踪
+    每次筛查把查询对象的完整记录列表（所有分页）交给diff()，与库中保存的上次结果比较：
+    库中没有的记录为新增，指纹不同的为变更，上次有而这次没有的为移除（如下架）。
+    比较结果每commit_every个查询对象提交一次；进程在提交前退出时，这些查询对象下次会再次产生相同事件。
+    """
+
+    def __init__(self, path, id_key='dataId', ignore_keys=(), commit_every=1000):
+        """
+        :param path: SQLite数据库文件路径
+        :param id_key: 记录ID的键名，记录中没有该键时以内容指纹作为ID
+        :param ignore_keys: 计算指纹时忽略的键，如每次返回都会变化的字段
+        :param commit_every: 每比较多少个查询对象提交一次
+        """
+        self.path = path
+        self.id_key = id_key
+        self.ignore_keys = frozenset(ignore_keys)
+        self.commit_every = commit_every
+        import sqlite3
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS records (subject TEXT NOT NULL, data_id TEXT NOT NULL, '
+                           'fingerprint TEXT NOT NULL, updated REAL NOT NULL, PRIMARY KEY (subject, data_id))')
+        self._conn.commit()
+        self._pending = 0
+        self._stats = {'subjects': 0, 'skipped': 0, ADDED: 0, UPDATED: 0, REMOVED: 0, 'unchanged': 0}
+
+    @staticmethod
+    def subject_of(category, search_form):
+        """
+        由接口类别和查询条件（分页字段和预留参数除外）生成查询对象标识
+        """
+        f = search_form
+        fields = (f.name, f.cardNum, f.hashParam, f.hashType, f.dataType, f.publishDate, f.publishFromDate,
+                  f.publishToDate, f.delist, f.caseCode)
+        text = json.dumps([category, fields], ensure_ascii=False)
+        return category + ':' + hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+    def fingerprint(self, record):
+        """
+        记录内容指纹：忽略ignore_keys后按键排序序列化再取摘要
+        """
+        if self.ignore_keys and isinstance(record, dict):
+            record = {key: value for key, value in record.items() if key not in self.ignore_keys}
+        text = json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+    def diff(self, subject, records):
+        """
+        比较查询对象本次的完整记录与上次筛查的结果，并保存本次结果
+        :param subject: 查询对象标识
+        :param records: 记录的可迭代对象，可以是DecryptedRecordStream
+        :return: ChangeEvent列表
+        """
+        current = {}
+        for record in records:
+            fingerprint = self.fingerprint(record)
+            data_id = record.get(self.id_key) if isinstance(record, dict) else None
+            current[fingerprint if data_id is None else str(data_id)] = (fingerprint, record)
+
+        now = time.time()
+        events = []
+        with self._lock:
+            previous = dict(self._conn.execute('SELECT data_id, fingerprint FROM records WHERE subject = ?',
+                                               (subject,)))
+            upserts = []
+            for data_id, (fingerprint, record) in current.items():
+                old = previous.pop(data_id, None)
+                if old == fingerprint:
+                    self._stats['unchanged'] += 1
+                    continue
+                kind = ADDED if old is None else UPDATED
+                events.append(ChangeEvent(kind, subject, data_id, record))
+                upserts.append((subject, data_id, fingerprint, now))
+                self._stats[kind] += 1
+            for data_id in previous:
+                events.append(ChangeEvent(REMOVED, subject, data_id))
+                self._stats[REMOVED] += 1
+            if upserts:
+                self._conn.executemany('INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)', upserts)
+            if previous:
+                self._conn.executemany('DELETE FROM records WHERE subject = ? AND data_id = ?',
+                                       [(subject, data_id) for data_id in previous])
+            self._stats['subjects'] += 1
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self._conn.commit()
+                self._pending = 0
+        return events
+
+    def diff_result(self, subject, response, records_key=None):
+        """
+        比较接口方法的返回结果
+        返回代码不是0000或没有数据时（如请求异常9999）不比较，也不修改库中的记录，避免一次失败被当作全部移除。
+        result须包含查询对象的全部记录：只传入分页查询的一页时，其他页的记录会被当作移除，
+        分页查询请使用query_all_records()或diff_query()。
+        :param subject: 查询对象标识
+        :param response: 接口方法返回的元组（code, msg, result）
+        :param records_key: 记录数组的键名，为空时取第一个数组成员
+        :return: ChangeEvent列表
+        """
+        code, msg, result = response
+        if code != '0000' or result is None:
+            with self._lock:
+                self._stats['skipped'] += 1
+            return []
+        return self.diff(subject, extract_records(result, records_key))
+
+    def diff_query(self, util, method, search_form, records_key=None, max_pages=100):
+        """
+        逐页查询一个查询对象的全部记录并比较，查询对象标识由接口方法名和查询条件生成
+        :param util: XunshubaoZxgkUtil
+        :param method: 查询接口方法名，如zxgk_query_for_person
+        :param search_form: 查询条件
+        :return: ChangeEvent列表，查询失败时为空列表
+        """
+        subject = self.subject_of(method, search_form)
+        return self.diff_result(subject, query_all_records(util, method, search_form, records_key, max_pages))
+
+    def screen(self, items):
+        """
+        逐个比较一组查询对象，产出变化事件
+        :param items: （查询对象标识, 记录列表）的可迭代对象
+        :return: 生成器，逐个产出ChangeEvent
+        """
+        for subject, records in items:
+            for event in self.diff(subject, records):
+                yield event
+        self.commit()
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def stats(self):
+        """
+        比较过的查询对象数、因查询失败跳过的次数和各类事件数
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
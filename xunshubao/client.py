@@ -0,0 +1,775 @@
+# -*- coding: utf-8 -*-
+# 循数宝V3版API接口调用客户端
+# 具体接口定义及描述请参考《涉诉数据接口文档》
+
+import base64
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from .bulk import Sm4Ecb, pkcs7_pad, pkcs7_unpad, pkcs7_pad_join, split_at, sm3_hexdigests
+from .clock import ServerClock
+from .form import ZxgkSearchForm
+from .stream import DecryptedRecordStream, read_envelope
+from .transport import RequestsTransport
+
+# pycryptodome（AES）、gmssl（SM3）在首次使用时才导入，
+# 只使用其中一种算法组合的调用方不必承担其余依赖的导入耗时
+# SM4使用bulk.Sm4Ecb，有cryptography时使用OpenSSL实现
+
+# 批量加解密时每次拼接处理的条数
+_BULK_CHUNK = 4096
+
+# 未配置剖析器时使用的空阶段计时
+_no_phase = contextlib.nullcontext
+
+# 摘要算法（signType）对应的hashlib算法名
+_SIGN_ALGORITHMS = {'MD5': 'md5', 'SM3': 'sm3', 'SHA256': 'sha256'}
+
+def _new_request_id():
+    """
+    生成新的requestId（32位十六进制），用于对冲、重试等需要另发请求的场合
+    requestId在一个appKey下须全局唯一，且不超过64个字符
+    """
+    return os.urandom(16).hex()
+
+
+# 业务接口方法名，账号池、调度器等按名称转发调用
+ENDPOINT_METHODS = (
+    'zxgk_check_for_company', 'zxgk_check_for_person',
+    'shixin_check_for_company', 'shixin_check_for_person',
+    'xgl_check_for_company', 'xgl_check_for_person',
+    'zhixing_check_for_company', 'zhixing_check_for_person',
+    'zhongben_check_for_company', 'zhongben_check_for_person',
+    'zxgk_query_for_company', 'zxgk_query_for_person',
+    'sifa_data_info',
+)
+
+
+class XunshubaoZxgkUtil:
+    """
+    执行公开核验/查询接口调用工具类
+    同一实例可在多个线程间共享：传输层由各线程共享，加解密器按线程缓存，调用计数加锁更新
+    """
+
+    def __init__(self, appKey, signSecretKey, sm4SecretKey, aesSecretKey, pool_maxsize=64, transport=None):
+        """
+        :param appKey: 用户标识
+        :param signSecretKey: 签名密钥
+        :param sm4SecretKey: SM4密钥
+        :param aesSecretKey: AES密钥
+        :param pool_maxsize: 默认传输层的连接池最大连接数，建议不小于并发线程数
+        :param transport: 传输层（Transport），为空时首次请求前创建RequestsTransport
+        """
+        self.appKey = appKey
+        self.signSecretKey = signSecretKey
+        self.sm4SecretKey = sm4SecretKey
+        self.aesSecretKey = aesSecretKey
+        self.timeout = 5
+        # 流式模式下每次读取的响应体大小（字节）
+        self.stream_chunk_size = 64 * 1024
+        # 对冲请求策略（HedgePolicy），为空时不对冲，仅作用于核验接口
+        self.hedge_policy = None
+        # 请求调度器（RequestScheduler），为空时不排队
+        self.scheduler = None
+        # 核验无结果过滤器（NegativeResultFilter），为空时每次都请求，仅作用于核验接口
+        self.negative_filter = None
+        # 阶段耗时记录器（PhaseProfiler），为空时不剖析
+        self.profiler = None
+        # 请求时间戳来源，根据响应头Date修正本机时钟偏差
+        self.clock = ServerClock()
+        # 自适应超时与并发控制器（AdaptiveController），为空时使用固定的timeout、不限制并发
+        self.adaptive = None
+        # 请求/应答落盘（Spool），为空时不落盘，流式模式不落盘
+        self.spool = None
+        # 表示时间戳超出允许范围的错误代码（见接口文档附录A），返回这些代码时用修正后的时间戳重新签名并重试一次
+        self.timestamp_skew_codes = ()
+        # 签名前缀的摘要状态，以（摘要算法, appKey）为键，签名时复制后继续计算；appKey被修改后自动使用新的前缀
+        self._sign_prefix = {}
+        # 传输层
+        self.pool_maxsize = pool_maxsize
+        self.transport = transport
+        self._transport_lock = threading.Lock()
+        # 线程私有状态：按密钥缓存的加解密器
+        self._local = threading.local()
+        # 调用计数
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'success': 0, 'failure': 0, 'error': 0}
+
+    def zxgk_check_for_company(self, search_form: ZxgkSearchForm):
+        """
+        执行公开核验接口-企业 请求示例
+        :param search_form: 查询条件
+        :return:元组（code, msg, result）
+        """
+        # 请求地址
+        url = 'https://api.xunshubao.com/v3/zxgkcheck/company'
+        return self._execute_form('执行公开核验接口-企业', url, search_form, 'MD5', 'AES', check=True)
+
+    def zxgk_check_for_person(self, search_form: ZxgkSearchForm):
+        """
+        执行公开核验接口-个人 请求示例
+        :param search_form: 查询条件
+        :return:元组（code, msg, result）
+        """
+        # 请求地址
+        url = 'https://api.xunshubao.com/v3/zxgkcheck/person'
+        return self._execute_form('执行公开核验接口-个人', url, search_form, 'SM3', 'SM4', check=True)
+
+    def shixin_check_for_company(self, search_form: ZxgkSearchForm):
+        """
+        失信核验接口-企业 请求示例
+        :param search_form: 查询条件
+        :return:元组（code, msg, result）
+        """
+        # 请求地址
+        url = 'https://api.xunshubao.com/v3/shixincheck/company'
+        return self._execute_form('失信核验接口-企业', url, search_form, 'MD5', 'AES', check=True)
+
+    def shixin_check_for_person(self, search_form: ZxgkSearchForm):
+        """
+        失信核验接口-个人 请求示例
+        :param search_form: 查询条件
+        :return:元组（code, msg, result）
+        """
+        # 请求地址
+        url = 'https://api.xunshubao.com/v3/shixincheck/person'
+        return self._execute_form('失信核验接口-个人', url, search_form, 'SM3', 'SM4', check=True)
+
+    def xgl_check_for_company(self, search_form: ZxgkSearchForm):
+        """
+        限制消费人员核验接口-企业 请求示例
+        :param search_form: 查询条件
+        :return:元组（code, msg, result）
+        """
+        # 请求地址
+        url = 'https://api.xunshubao.com/v3/xglcheck/company'
+        return self._execute_form('限制消费核验接口-企业', url, search_form, 'MD5', 'AES', check=True)
+
+    def xgl_check_for_person(self, search_form: ZxgkSearchForm):
+        """
+        限制消费人员核验接口-个人 请求示例
+        :param search_form: 查询条件
+        :return:元组（code, msg, result）
+        """
+        # 请求地址
+        url = 'https://api.xunshubao.com/v3/xglcheck/person'
+        return self._execute_form('限制消费核验接口-个人', url, search_form, 'SM3', 'SM4', check=True)
+
+    def zhixing_check_for_company(self, search_form: ZxgkSearchForm):
+        """
+        被执行人核验接口-企业 请求示例
+        :param search_form: 查询条件
+        :return:元组（code, msg, result）
+        """
+        # 请求地址
+        url = 'https://api.xunshubao.com/v3/zhixingcheck/company'
+        return self._execute_form('被执行人核验接口-企业', url, search_form, 'MD5', 'AES', check=True)
+
+    def zhixing_check_for_person(self, search_form: ZxgkSearchForm):
+        """
+        被执行人核验接口-个人 请求示例
+        :param search_form: 查询条件
+        :return:元组（code, msg, result）
+        """
+        # 请求地址
+        url = 'https://api.xunshubao.com/v3/zhixingcheck/person'
+        return self._execute_form('被执行人核验接口-个人', url, search_form, 'SM3', 'SM4', check=True)
+
+    def zhongben_check_for_company(self, search_form: ZxgkSearchForm):
+        """
+        终本案件核验接口-企业 请求示例
+        :param search_form: 查询条件
+        :return:元组（code, msg, result）
+        """
+        # 请求地址
+        url = 'https://api.xunshubao.com/v3/zhongbencheck/company'
+        return self._execute_form('终本案件核验接口-企业', url, search_form, 'MD5', 'AES', check=True)
+
+    def zhongben_check_for_person(self, search_form: ZxgkSearchForm):
+        """
+        终本案件核验接口-个人 请求示例
+        :param search_form: 查询条件
+        :return:元组（code, msg, result）
+        """
+        # 请求地址
+        url = 'https://api.xunshubao.com/v3/zhongbencheck/person'
+        return self._execute_form('终本案件核验接口-个人', url, search_form, 'SM3', 'SM4', check=True)
+
+    def zxgk_query_for_company(self, search_form: ZxgkSearchForm, stream=False, records_key=None):
+        """
+        执行公开查询接口-企业 请求示例
+        :param search_form: 查询条件
+        :param stream: 是否流式解密，为True时result为逐条产出记录的DecryptedRecordStream
+        :param records_key: 流式模式下记录数组的键名，为空时取第一个数组成员
+        :return:元组（code, msg, result）
+        """
+        # 请求地址
+        url = 'https://api.xunshubao.com/v3/zxgkquery/company'
+        return self._execute_form('执行公开查询接口-企业', url, search_form, 'MD5', 'AES', stream=stream,
+                                  records_key=records_key)
+
+    def zxgk_query_for_person(self, search_form: ZxgkSearchForm, stream=False, records_key=None):
+        """
+        执行公开查询接口-个人 请求示例
+        :param search_form: 查询条件
+        :param stream: 是否流式解密，为True时result为逐条产出记录的DecryptedRecordStream
+        :param records_key: 流式模式下记录数组的键名，为空时取第一个数组成员
+        :return:元组（code, msg, result）
+        """
+        # 请求地址
+        url = 'https://api.xunshubao.com/v3/zxgkquery/person'
+        return self._execute_form('执行公开查询接口-个人', url, search_form, 'SM3', 'SM4', stream=stream,
+                                  records_key=records_key)
+
+    def sifa_data_info(self, requestId, dataType, dataId, extra='', stream=False, records_key=None):
+        """
+        执行公开数据详情 请求示例
+        :param requestId: 请求唯一标识
+        :param dataType: 数据类型
+        :param dataId: 数据ID
+        :param extra: 预留参数（原值返回），默认为空
+        :param stream: 是否流式解密，为True时result为逐条产出记录的DecryptedRecordStream
+        :param records_key: 流式模式下记录数组的键名，为空时取第一个数组成员
+        :return:元组（code, msg, result）
+        """
+        # 请求地址
+        url = 'https://api.xunshubao.com/v3/sifa/datainfo'
+
+        # 业务请求参数构建
+        req_body = {
+            'dataType': dataType,
+            'dataId': dataId,
+            'extra': extra
+        }
+        # 业务请求参数转换为JSON字符串
+        req_body_str = json.dumps(req_body)
+        return self._schedule(self._execute, '执行公开数据详情', url, requestId, req_body_str, 'MD5', 'AES',
+                              stream=stream, records_key=records_key)
+
+    def _execute_form(self, api_name, url, search_form: ZxgkSearchForm, sign_type, encryption, check=False,
+                      stream=False, records_key=None):
+        """
+        使用查询表单的请求模板调用接口，翻页时只重新填入pageNo
+        :param api_name: 接口名称（用于日志）
+        :param url: 请求地址
+        :param search_form: 查询条件
+        :param sign_type: 摘要算法 MD5/SM3
+        :param encryption: 加密方式 AES/SM4
+        :param check: 是否核验接口，核验接口可使用对冲请求和无结果过滤器（配置了hedge_policy、negative_filter时生效）
+        :param stream: 是否流式解密
+        :param records_key: 流式模式下记录数组的键名
+        :return:元组（code, msg, result）
+        """
+        negative_filter = self.negative_filter if check else None
+        if negative_filter is not None:
+            # 接口类别，如shixincheck/person
+            category = url.rsplit('/v3/', 1)[-1]
+            answer = negative_filter.lookup(category, search_form)
+            if answer is not None:
+                logging.info('%s近期核验无结果，本地应答' % api_name)
+                return answer
+
+        template = search_form.request_template()
+        req_body_str = template.body_str(search_form.pageNo)
+        if check and self.hedge_policy is not None:
+            result = self._schedule(self._execute_hedged, api_name, url, search_form.requestId, req_body_str,
+                                    sign_type, encryption, template)
+        else:
+            result = self._schedule(self._execute, api_name, url, search_form.requestId, req_body_str, sign_type,
+                                    encryption, template, stream, records_key)
+
+        if negative_filter is not None and result[0] == '0000' and result[2] is not None \
+                and negative_filter.is_clean(category, result[2]):
+            negative_filter.add(category, search_form)
+        return result
+
+    def _schedule(self, fn, *args, **kwargs):
+        """
+        配置了调度器时排队获得并发名额后再执行
+        """
+        scheduler = self.scheduler
+        if scheduler is None:
+            return fn(*args, **kwargs)
+        return scheduler.run(fn, *args, **kwargs)
+
+    def _execute_hedged(self, api_name, url, requestId, req_body_str, sign_type, encryption, template):
+        """
+        对冲调用：主请求超过分位数延迟未返回时，以新的时间戳和新生成的requestId再发一次，取先返回的有效结果。
+        主请求在独立线程中立即开始（不在对冲线程池中排队），调用线程等待，这样对冲请求先返回时可以直接返回；
+        对冲请求在线程池中执行，尚未开始的会被取消，已发出的请求无法中断，其结果被丢弃。
+        :return:元组（code, msg, result）
+        """
+        policy = self.hedge_policy
+        delay = min(policy.begin(url), self.timeout)
+        primary = policy.start(self._timed_execute, policy, api_name, url, requestId, req_body_str, sign_type,
+                               encryption, template)
+        done, _ = wait([primary], timeout=delay)
+        if done or not policy.acquire():
+            return primary.result()
+
+        hedge_request_id = _new_request_id()
+        logging.info('%s在%.3f秒内未返回，发出对冲请求，requestId=%s，对冲requestId=%s'
+                     % (api_name, delay, requestId, hedge_request_id))
+        hedge = policy.submit(self._timed_execute, policy, api_name, url, hedge_request_id, req_body_str,
+                              sign_type, encryption, template)
+        pending = {primary, hedge}
+        result = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                # 请求异常（9999）时继续等待另一个请求
+                if result[0] != '9999':
+                    for loser in pending:
+                        loser.cancel()
+                    if future is hedge:
+                        policy.hedge_won()
+                    return result
+        return result
+
+    def _timed_execute(self, policy, api_name, url, requestId, req_body_str, sign_type, encryption, template):
+        """
+        调用接口并记录耗时，供对冲策略计算分位数延迟
+        """
+        start = time.perf_counter()
+        result = self._execute(api_name, url, requestId, req_body_str, sign_type, encryption, template)
+        policy.record(url, time.perf_counter() - start)
+        return result
+
+    def _execute(self, api_name, url, requestId, req_body_str, sign_type, encryption, template=None, stream=False,
+                 records_key=None):
+        """
+        签名、加密并提交请求，解密返回结果
+        :param api_name: 接口名称（用于日志）
+        :param url: 请求地址
+        :param requestId: 请求唯一标识
+        :param req_body_str: 业务请求参数JSON字符串
+        :param sign_type: 摘要算法 MD5/SM3
+        :param encryption: 加密方式 AES/SM4
+        :param template: 请求模板，用于复用静态前缀的密文
+        :param stream: 是否流式解密
+        :param records_key: 流式模式下记录数组的键名
+        :return:元组（code, msg, result）
+        """
+        controller = self.adaptive
+        timeout = controller.acquire(url, self.timeout) if controller is not None else self.timeout
+        start = time.perf_counter()
+        result = "9999", "请求异常", None
+        profiler = self.profiler
+        phase = profiler.phase if profiler is not None else _no_phase
+        try:
+            with profiler.sample(api_name) if profiler is not None else _no_phase():
+                result = self._send(api_name, url, requestId, req_body_str, sign_type, encryption, template, stream,
+                                    records_key, phase, timeout)
+                if result[0] in self.timestamp_skew_codes:
+                    # 时钟偏差已从本次响应中学习，以新的requestId重新签名后重试（requestId在一个appKey下须唯一）
+                    retry_request_id = _new_request_id()
+                    logging.warning('%s时间戳超出允许范围，错误代码=%s，当前时钟偏差=%.3f秒，重新签名后重试，'
+                                    'requestId=%s，重试requestId=%s'
+                                    % (api_name, result[0], self.clock.offset, requestId, retry_request_id))
+                    result = self._send(api_name, url, retry_request_id, req_body_str, sign_type, encryption,
+                                        template, stream, records_key, phase, timeout)
+            return result
+        finally:
+            if controller is not None:
+                if isinstance(result[2], DecryptedRecordStream):
+                    # 流式模式下返回时数据仍在下载，读完或关闭结果时才归还并发名额，延迟包含下载时间
+                    code = result[0]
+                    result[2].add_close_callback(
+                        lambda: controller.release(url, time.perf_counter() - start, code))
+                else:
+                    controller.release(url, time.perf_counter() - start, result[0])
+
+    def _send(self, api_name, url, requestId, req_body_str, sign_type, encryption, template, stream, records_key,
+              phase, timeout):
+        """
+        _execute的实现，phase为阶段计时的上下文管理器，timeout为本次请求的超时（秒）
+        """
+        # 当前时间戳（毫秒），已按服务端时钟修正
+        timestamp_ms = self.clock.timestamp_ms()
+
+        # 签名：appKey + timestamp + signSecretKey + requestBody
+        with phase('sign'):
+            token = self.sign(sign_type, timestamp_ms, req_body_str)
+
+        # 请求头构建
+        req_header = {
+            'appKey': self.appKey,
+            'timestamp': timestamp_ms,
+            'token': token,
+            'signType': sign_type,
+            'requestId': requestId,
+            'encryption': encryption
+        }
+        # 请求参数构建
+        with phase('encrypt'):
+            post_data = {
+                'requestHeader': req_header,
+                'requestBody': self.encrypt_body(encryption, req_body_str, template)
+            }
+        if stream:
+            return self._execute_stream(api_name, url, post_data, encryption, records_key, timeout)
+        try:
+            # 向服务器提交请求
+            sent = time.monotonic()
+            with phase('request'):
+                search_resp = self._get_transport().post(url, json.dumps(post_data).encode('utf-8'),
+                                                         {'Content-Type': 'application/json'}, timeout)
+            self.clock.observe(search_resp.headers.get('Date'), sent, time.monotonic())
+            status_code = search_resp.status_code
+            if search_resp.status_code == 200:
+                with phase('parse'):
+                    search_result = search_resp.content.decode('utf-8').strip()
+                    contentJson = json.loads(search_result)
+                code = contentJson['code']
+                msg = contentJson['msg']
+                if code == '0000':
+                    encodedData = contentJson['data']
+                    with phase('decrypt'):
+                        decodedTxt = self.decrypt_body(encryption, encodedData)
+                    logging.info('%s查询成功，解密后的报文如下：' % api_name)
+                    logging.info(decodedTxt)
+                    self._count('success')
+                    result = code, msg, decodedTxt
+                else:
+                    logging.warning("%s查询不成功，错误代码=%s，错误信息=%s" % (api_name, code, msg))
+                    self._count('failure')
+                    result = code, msg, None
+            else:
+                logging.warning('%s请求异常，响应状态码=%s' % (api_name, status_code))
+                self._count('error')
+                return "9999", "响应状态码失败 status_code=%s" % status_code, None
+        except Exception as rte:
+            logging.warning('%s请求异常，url=%s，异常=%s' % (api_name, url, rte))
+            self._count('error')
+            return "9999", "请求异常", None
+        # 落盘在请求的异常处理之外进行，落盘失败不影响已取得的应答
+        self._spool_record(api_name, url, req_header, req_body_str, *result)
+        return result
+
+    def _spool_record(self, api_name, url, req_header, req_body_str, code, msg, result):
+        """
+        配置了spool时记录已签名的请求和解密后的应答，落盘失败（如磁盘已满）时记录日志，仍返回应答
+        """
+        spool = self.spool
+        if spool is None:
+            return
+        try:
+            spool.append({
+                'time': time.time(),
+                'api': api_name,
+                'url': url,
+                'requestHeader': req_header,
+                'requestBody': req_body_str,
+                'code': code,
+                'msg': msg,
+                'result': result,
+            })
+        except Exception as rte:
+            logging.error('%s应答落盘失败，requestId=%s，异常=%s' % (api_name, req_header['requestId'], rte))
+
+    def _execute_stream(self, api_name, url, post_data, encryption, records_key, timeout):
+        """
+        提交请求并流式读取返回结果：读到加密数据开始处即返回，数据部分在迭代结果时分块解密
+        :return:元组（code, msg, DecryptedRecordStream）
+        """
+        try:
+            # 向服务器提交请求
+            sent = time.monotonic()
+            search_resp = self._get_transport().post_stream(url, json.dumps(post_data).encode('utf-8'),
+                                                            {'Content-Type': 'application/json'}, timeout,
+                                                            self.stream_chunk_size)
+            self.clock.observe(search_resp.headers.get('Date'), sent, time.monotonic())
+        except Exception as rte:
+            logging.warning('%s请求异常，url=%s，异常=%s' % (api_name, url, rte))
+            self._count('error')
+            return "9999", "请求异常", None
+
+        try:
+            status_code = search_resp.status_code
+            if status_code != 200:
+                search_resp.close()
+                logging.warning('%s请求异常，响应状态码=%s' % (api_name, status_code))
+                self._count('error')
+                return "9999", "响应状态码失败 status_code=%s" % status_code, None
+            contentJson, first_data, text_chunks = read_envelope(search_resp.iter_chunks())
+            code = contentJson['code']
+            msg = contentJson['msg']
+            if code != '0000' or contentJson.get('data') is None:
+                search_resp.close()
+                if code != '0000':
+                    logging.warning("%s查询不成功，错误代码=%s，错误信息=%s" % (api_name, code, msg))
+                    self._count('failure')
+                else:
+                    self._count('success')
+                return code, msg, None
+            if first_data is None:
+                # 公共字段位于data之后时已读取完整报文
+                search_resp.close()
+                first_data = contentJson['data'] + '"'
+            logging.info('%s查询成功，开始流式解密' % api_name)
+            self._count('success')
+            return code, msg, DecryptedRecordStream(text_chunks, self._block_decryptor(encryption), first_data,
+                                                    records_key, search_resp.close)
+        except Exception as rte:
+            search_resp.close()
+            logging.warning('%s请求异常，url=%s，异常=%s' % (api_name, url, rte))
+        self._count('error')
+        return "9999", "请求异常", None
+
+    def _block_decryptor(self, encryption):
+        """
+        流式解密使用的分组解密函数（不去除填充）
+        每个流独立创建解密器，不依赖线程缓存，可以在任意线程中迭代
+        """
+        if encryption == 'AES':
+            from Crypto.Cipher import AES
+            return AES.new(self.aesSecretKey.encode('utf-8'), AES.MODE_ECB).decrypt
+
+        return Sm4Ecb(base64.b64decode(self.sm4SecretKey)).decrypt
+
+    def _get_transport(self):
+        """
+        当前使用的传输层，未指定时创建默认的RequestsTransport
+        """
+        transport = self.transport
+        if transport is None:
+            with self._transport_lock:
+                if self.transport is None:
+                    self.transport = RequestsTransport(self.pool_maxsize)
+                transport = self.transport
+        return transport
+
+    def _count(self, result):
+        """
+        更新调用计数
+        :param result: success/failure/error
+        """
+        with self._stats_lock:
+            self._stats['requests'] += 1
+            self._stats[result] += 1
+
+    def stats(self):
+        """
+        调用计数快照
+        :return: 字典（requests, success, failure, error）
+        """
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def close(self):
+        """
+        关闭传输层
+        """
+        with self._transport_lock:
+            if self.transport is not None:
+                self.transport.close()
+
+    def sign(self, sign_type, timestamp_ms, req_body_str):
+        """
+        计算签名 token = 摘要(appKey + timestamp + signSecretKey + requestBody)
+        appKey前缀的摘要状态首次使用时计算并缓存，之后每次调用只需复制后继续计算
+        :param sign_type: 摘要算法 MD5/SM3/SHA256
+        :param timestamp_ms: 时间戳（毫秒）
+        :param req_body_str: 业务请求参数JSON字符串
+        :return: 签名
+        """
+        appKey = self.appKey
+        token_tail = str(timestamp_ms) + self.signSecretKey + req_body_str
+        prefix_state = self._sign_prefix.get((sign_type, appKey))
+        if prefix_state is None:
+            prefix_state = self._sign_prefix[(sign_type, appKey)] = self._new_sign_state(sign_type, appKey)
+        if prefix_state is False:
+            # 当前环境的hashlib不支持SM3，使用gmssl逐次完整计算
+            return self.sm3(appKey + token_tail)
+        m = prefix_state.copy()
+        m.update(token_tail.encode('utf-8'))
+        return m.hexdigest()
+
+    @staticmethod
+    def _new_sign_state(sign_type, appKey):
+        """
+        计算appKey前缀的摘要状态
+        :return: hashlib摘要对象；hashlib不支持SM3时返回False，由gmssl计算
+        """
+        algorithm = _SIGN_ALGORITHMS.get(sign_type)
+        if algorithm is None:
+            raise ValueError('不支持的摘要算法：%s' % sign_type)
+        try:
+            prefix_state = hashlib.new(algorithm)
+        except ValueError:
+            try:
+                # FIPS模式下MD5须声明不用于安全目的（Python 3.9及以上）
+                prefix_state = hashlib.new(algorithm, usedforsecurity=False)
+            except (ValueError, TypeError):
+                # 部分OpenSSL版本不提供SM3
+                if sign_type == 'SM3':
+                    return False
+                raise ValueError('当前环境的hashlib不支持摘要算法：%s' % sign_type)
+        prefix_state.update(appKey.encode('utf-8'))
+        return prefix_state
+
+    def encrypt_body(self, encryption, req_body_str, template=None):
+        """
+        加密业务请求参数
+        ECB模式下各分组独立加密，模板前缀中完整分组的密文只计算一次，之后仅加密剩余部分
+        :param encryption: 加密方式 AES/SM4
+        :param req_body_str: 业务请求参数JSON字符串
+        :param template: 请求模板，为空时整体加密
+        :return: base64编码的密文
+        """
+        if template is None:
+            if encryption == 'AES':
+                return self.encrypt_by_aes(self.aesSecretKey, req_body_str)
+            return self.encrypt_by_sm4(self.sm4SecretKey, req_body_str)
+
+        body_bytes = req_body_str.encode('utf-8')
+        aligned = template.aligned_prefix_len
+        if encryption == 'AES':
+            cipher = self._aes_cipher(self.aesSecretKey)
+            cache_key = ('AES', self.aesSecretKey)
+            head = template.cipher_prefix.get(cache_key)
+            if head is None:
+                head = cipher.encrypt(body_bytes[:aligned])
+                template.cipher_prefix[cache_key] = head
+            from Crypto.Util.Padding import pad
+            tail = cipher.encrypt(pad(body_bytes[aligned:], cipher.block_size))
+        else:
+            sm4 = self._sm4_cipher(self.sm4SecretKey)
+            cache_key = ('SM4', self.sm4SecretKey)
+            head = template.cipher_prefix.get(cache_key)
+            if head is None:
+                head = sm4.encrypt(body_bytes[:aligned])
+                template.cipher_prefix[cache_key] = head
+            tail = sm4.encrypt(pkcs7_pad(body_bytes[aligned:]))
+        return base64.b64encode(head + tail).decode('utf-8')
+
+    def decrypt_body(self, encryption, ciphertext):
+        """
+        解密返回数据
+        :param encryption: 加密方式 AES/SM4
+        :param ciphertext: base64编码的密文
+        :return: 明文
+        """
+        if encryption == 'AES':
+            return self.decrypt_by_aes(self.aesSecretKey, ciphertext)
+        return self.decrypt_by_sm4(self.sm4SecretKey, ciphertext)
+
+    # MD5方法
+    def md5(self, token_src):
+        m = hashlib.md5()
+        m.update(token_src.encode('utf-8'))
+        token = m.hexdigest()
+        return token
+
+    def sm3(self, txt):
+        return sm3_hexdigests([txt])[0]
+
+    def sm3_many(self, txts):
+        """
+        批量计算SM3摘要，如批量处理身份证号
+        :param txts: 字符串列表
+        :return: 十六进制摘要列表
+        """
+        return sm3_hexdigests(txts)
+
+    def encrypt_many(self, encryption, txts):
+        """
+        批量加密业务请求参数：每批数据逐条填充后拼接，一次调用完成加密，再按条切分编码
+        :param encryption: 加密方式 AES/SM4
+        :param txts: 明文字符串列表
+        :return: base64编码的密文列表，与输入一一对应
+        """
+        crypt = self._aes_cipher(self.aesSecretKey).encrypt if encryption == 'AES' \
+            else self._sm4_cipher(self.sm4SecretKey).encrypt
+        b64encode = base64.b64encode
+        out = []
+        for i in range(0, len(txts), _BULK_CHUNK):
+            data, ends = pkcs7_pad_join([txt.encode('utf-8') for txt in txts[i:i + _BULK_CHUNK]])
+            out.extend(b64encode(item).decode('utf-8') for item in split_at(crypt(data), ends))
+        return out
+
+    def decrypt_many(self, encryption, ciphertexts):
+        """
+        批量解密返回数据
+        :param encryption: 加密方式 AES/SM4
+        :param ciphertexts: base64编码的密文列表
+        :return: 明文列表，与输入一一对应
+        """
+        crypt = self._aes_cipher(self.aesSecretKey).decrypt if encryption == 'AES' \
+            else self._sm4_cipher(self.sm4SecretKey).decrypt
+        out = []
+        for i in range(0, len(ciphertexts), _BULK_CHUNK):
+            items = [base64.b64decode(ciphertext) for ciphertext in ciphertexts[i:i + _BULK_CHUNK]]
+            ends = []
+            end = 0
+            for j, item in enumerate(items):
+                # 拼接前逐条检查长度，否则一条错误的密文会错开其后所有密文的分组边界
+                if not item or len(item) % 16:
+                    raise ValueError('第%d条密文长度不是分组长度的整数倍' % (i + j))
+                end += len(item)
+                ends.append(end)
+            out.extend(pkcs7_unpad(item).decode('utf-8') for item in split_at(crypt(b''.join(items)), ends))
+        return out
+
+    def _ciphers(self):
+        """
+        当前线程的加解密器缓存
+        """
+        ciphers = getattr(self._local, 'ciphers', None)
+        if ciphers is None:
+            ciphers = self._local.ciphers = {}
+        return ciphers
+
+    def _aes_cipher(self, key):
+        """
+        当前线程按密钥缓存的AES-ECB加解密器，ECB模式无链式状态，可重复用于加密和解密
+        """
+        ciphers = self._ciphers()
+        cipher = ciphers.get(('AES', key))
+        if cipher is None:
+            from Crypto.Cipher import AES
+            cipher = ciphers[('AES', key)] = AES.new(key.encode('utf-8'), AES.MODE_ECB)
+        return cipher
+
+    def _sm4_cipher(self, key):
+        """
+        当前线程按密钥缓存的SM4加解密器，省去每次调用的密钥扩展
+        """
+        ciphers = self._ciphers()
+        sm4 = ciphers.get(('SM4', key))
+        if sm4 is None:
+            sm4 = ciphers[('SM4', key)] = Sm4Ecb(base64.b64decode(key))
+        return sm4
+
+    def encrypt_by_aes(self, key, txt):
+        from Crypto.Util.Padding import pad
+        cipher = self._aes_cipher(key)  # 获取 AES 加密器对象
+        padded_plaintext = pad(txt.encode('utf-8'), cipher.block_size)  # 填充明文数据
+        ciphertext = cipher.encrypt(padded_plaintext)  # 加密
+        encoded_data = base64.b64encode(ciphertext)
+        return encoded_data.decode('utf-8')
+
+    def decrypt_by_aes(self, key, ciphertext):
+        from Crypto.Util.Padding import unpad
+        cipher = self._aes_cipher(key)  # 获取 AES 解密器对象
+        decrypted = cipher.decrypt(base64.b64decode(ciphertext))  # 解密
+        decrypted_data = unpad(decrypted, cipher.block_size)  # 去除填充
+        return decrypted_data.decode('utf-8')
+
+    def encrypt_by_sm4(self, key, txt):
+        sm4 = self._sm4_cipher(key)
+        encrypt_value = sm4.encrypt(pkcs7_pad(txt.encode('utf-8')))  # bytes类型
+        encoded_data = base64.b64encode(encrypt_value)
+        return encoded_data.decode('utf-8')
+
+    def decrypt_by_sm4(self, key, ciphertext):
+        sm4 = self._sm4_cipher(key)
+        decrypt_value = pkcs7_unpad(sm4.decrypt(base64.b64decode(ciphertext)))  # bytes类型
+        return decrypt_value.decode('utf-8')
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# 服务端时钟：用单调时钟生成请求时间戳，并根据响应头Date学习本机与服务端的时钟偏差
+
+import threading
+import time
+
+
+class ServerClock:
+    """
+    请求时间戳来源
+    创建时记录一次系统时间，之后按单调时钟推算，系统时间被调整时时间戳不会跳变。
+    每个响应的Date头（秒级精度）给出服务端时间所在的区间，多次观测取交集逐步收窄；
+    区间不包含0即可确定本机时钟有偏差，此后的时间戳按区间中点修正。
+    """
+
+    def __init__(self):
+        self._base_wall = time.time()
+        self._base_mono = time.monotonic()
+        self._lock = threading.Lock()
+        # 服务端时间减本机时间（秒）的可能区间
+        self._low = None
+        self._high = None
+        self.offset = 0.0
+        # 最近一次解析的（Date头, 对应的时间（秒））；作为一个元组整体替换，其他线程不会读到不匹配的一对
+        self._last_date = (None, None)
+
+    def now(self):
+        """
+        修正后的当前时间（秒）
+        """
+        return self._base_wall + (time.monotonic() - self._base_mono) + self.offset
+
+    def timestamp_ms(self):
+        """
+        修正后的当前时间戳（毫秒）
+        """
+        return int(self.now() * 1000)
+
+    def _local_time(self, mono):
+        return self._base_wall + (mono - self._base_mono)
+
+    def _parse_date(self, date):
+        # Date头每秒才变化一次，缓存上次的解析结果
+        last_date, last_seconds = self._last_date
+        if date == last_date:
+            return last_seconds
+        from email.utils import parsedate_tz, mktime_tz
+        parsed = parsedate_tz(date)
+        seconds = mktime_tz(parsed) if parsed is not None else None
+        self._last_date = (date, seconds)
+        return seconds
+
+    def observe(self, date, sent_mono, received_mono):
+        """
+        根据响应头Date更新时钟偏差
+        :param date: 响应头Date的值，为空时忽略
+        :param sent_mono: 发出请求时的time.monotonic()
+        :param received_mono: 收到响应时的time.monotonic()
+        """
+        if not date:
+            return
+        server_seconds = self._parse_date(date)
+        if server_seconds is None:
+            return
+        # 服务端在发出请求到收到响应之间的某一时刻生成Date，其值为当时时间向下取整到秒
+        low = server_seconds - self._local_time(received_mono)
+        high = server_seconds + 1 - self._local_time(sent_mono)
+        with self._lock:
+            if self._low is None or low > self._high or high < self._low:
+                # 首次观测，或与之前的区间不相交（本机或服务端时钟发生了调整），重新开始
+                self._low, self._high = low, high
+            else:
+                self._low, self._high = max(self._low, low), min(self._high, high)
+            self.offset = 0.0 if self._low <= 0 <= self._high else (self._low + self._high) / 2
+
+    def stats(self):
+        """
+        当前的偏差估计
+        :return: 字典（offset, low, high），单位为秒
+        """
+        with self._lock:
+            return {'offset': self.offset, 'low': self._low, 'high': self._high}
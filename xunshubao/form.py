@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# 执行公开查询表单及请求模板
+
+import json
+
+
+class ZxgkSearchForm:
+    """
+    执行公开查询表单
+    """
+
+    def __init__(self, requestId='', name='', cardNum='', hashParam='', hashType='', dataType='', publishDate='',
+                 publishFromDate='', publishToDate='', delist='', caseCode='', pageNo=1, pageSize=10, extra=''):
+        """
+        执行公开查询条件
+        :param requestId:请求唯一标识
+        :param name:姓名
+        :param cardNum:身份证号
+        :param hashParam:使用哈希值的参数
+        :param hashType:使用哈希的算法
+        :param dataType: 数据类型
+        :param publishDate: 发布日期
+        :param publishFromDate: 发布日期开始
+        :param publishToDate: 发布日期截止
+        :param delist: 是否下架
+        :param caseCode: 案号
+        :param pageNo: 页码
+        :param pageSize: 每页记录数
+        :param extra:预留参数（原值返回），默认为空
+        :return:
+        """
+        self.requestId = requestId
+        self.name = name
+        self.cardNum = cardNum
+        self.hashParam = hashParam
+        self.hashType = hashType
+        self.dataType = dataType
+        self.publishDate = publishDate
+        self.publishFromDate = publishFromDate
+        self.publishToDate = publishToDate
+        self.delist = delist
+        self.caseCode = caseCode
+        self.pageNo = pageNo
+        self.pageSize = pageSize
+        self.extra = extra
+        # 请求模板，首次使用时构建
+        self._template = None
+
+    def request_body(self):
+        return {
+            'name': self.name,
+            'cardNum': self.cardNum,
+            'hashParam': self.hashParam,
+            'hashType': self.hashType,
+            'dataType': self.dataType,
+            'publishDate': self.publishDate,
+            'publishFromDate': self.publishFromDate,
+            'publishToDate': self.publishToDate,
+            'delist': self.delist,
+            'caseCode': self.caseCode,
+            'pageNo': self.pageNo,
+            'pageSize': self.pageSize,
+            'extra': self.extra
+        }
+
+    def static_fields(self):
+        """
+        除翻页字段（pageNo）以外的查询条件，用于判断请求模板是否仍然有效
+        """
+        return (self.name, self.cardNum, self.hashParam, self.hashType, self.dataType, self.publishDate,
+                self.publishFromDate, self.publishToDate, self.delist, self.caseCode, self.pageSize, self.extra)
+
+    def request_template(self):
+        """
+        获取请求模板，查询条件（pageNo除外）变化时重新构建
+        :return: ZxgkRequestTemplate
+        """
+        template = self._template
+        if template is None or template.static_fields != self.static_fields():
+            template = ZxgkRequestTemplate(self)
+            self._template = template
+        return template
+
+    def request_body_str(self):
+        """
+        业务请求参数JSON字符串，与json.dumps(self.request_body())的结果一致
+        """
+        return self.request_template().body_str(self.pageNo)
+
+    def __getstate__(self):
+        # 跨进程传递时不携带请求模板，由接收方按需重建
+        state = dict(self.__dict__)
+        state['_template'] = None
+        return state
+
+
+class ZxgkRequestTemplate:
+    """
+    查询请求模板
+    静态字段只序列化一次，翻页字段（pageNo）在发送时填入；同时缓存静态前缀的密文
+    """
+
+    # pageNo占位符，序列化后用于切分前后两段
+    _PAGE_NO_MARK = '\x00pageNo\x00'
+
+    def __init__(self, search_form: ZxgkSearchForm):
+        self.static_fields = search_form.static_fields()
+        req_body = search_form.request_body()
+        req_body['pageNo'] = self._PAGE_NO_MARK
+        self.prefix, self.suffix = json.dumps(req_body).split(json.dumps(self._PAGE_NO_MARK))
+        # json.dumps默认转义非ASCII字符，前缀的字符数即字节数
+        self.aligned_prefix_len = len(self.prefix) // 16 * 16
+        # 前缀完整分组的密文，key为（加密方式，密钥）
+        self.cipher_prefix = {}
+
+    def body_str(self, pageNo):
+        """
+        填入页码，生成业务请求参数JSON字符串
+        :param pageNo: 页码
+        """
+        return self.prefix + json.dumps(pageNo) + self.suffix
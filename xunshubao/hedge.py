@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# 对冲请求策略
+
+import threading
+from collections import deque
+
+
+class HedgePolicy:
+    """
+    对冲请求策略
+    核验请求超过该接口近期延迟的指定分位数仍未返回时，使用新的时间戳重新签名并发出一个重复请求，取先返回的结果。
+    对冲请求数量受预算比例限制，避免放大上游负载。
+    """
+
+    def __init__(self, percentile=95, budget=0.05, initial_delay=1.0, min_samples=20, window=1000, max_workers=32):
+        """
+        :param percentile: 触发对冲的延迟分位数
+        :param budget: 对冲请求数占请求总数的比例上限
+        :param initial_delay: 样本不足时使用的对冲延迟（秒）
+        :param min_samples: 使用分位数延迟前所需的最少样本数
+        :param window: 每个接口保留的最近延迟样本数
+        :param max_workers: 执行对冲请求的线程数
+        """
+        self.percentile = percentile
+        self.budget = budget
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.window = window
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._stats = {'requests': 0, 'hedges': 0, 'hedge_wins': 0, 'budget_denied': 0}
+        from concurrent.futures import ThreadPoolExecutor
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='xunshubao-hedge')
+        # 已提交未完成的请求，关闭时可取消
+        self._inflight = set()
+
+    def start(self, fn, *args):
+        """
+        在新线程中立即执行主请求：主请求不在线程池中排队，对冲延迟从请求实际开始时计算
+        :return: Future
+        """
+        from concurrent.futures import Future
+        future = Future()
+
+        def run():
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+
+        threading.Thread(target=run, name='xunshubao-hedge-primary', daemon=True).start()
+        return future
+
+    def submit(self, fn, *args):
+        """
+        在线程池中执行对冲请求
+        :return: Future
+        """
+        future = self._executor.submit(fn, *args)
+        with self._lock:
+            self._inflight.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self._lock:
+            self._inflight.discard(future)
+
+    def record(self, url, seconds):
+        """
+        记录一次请求耗时
+        :param url: 请求地址
+        :param seconds: 耗时（秒）
+        """
+        with self._lock:
+            latencies = self._latencies.get(url)
+            if latencies is None:
+                latencies = self._latencies[url] = deque(maxlen=self.window)
+            latencies.append(seconds)
+
+    def begin(self, url):
+        """
+        登记一次请求，返回发出对冲请求前的等待时间（秒）
+        :param url: 请求地址
+        """
+        with self._lock:
+            self._stats['requests'] += 1
+            latencies = self._latencies.get(url)
+            if latencies is None or len(latencies) < self.min_samples:
+                return self.initial_delay
+            samples = sorted(latencies)
+        index = min(len(samples) - 1, int(len(samples) * self.percentile / 100))
+        return samples[index]
+
+    def acquire(self):
+        """
+        申请一次对冲预算
+        :return: 预算充足返回True
+        """
+        with self._lock:
+            if self._stats['hedges'] + 1 > self._stats['requests'] * self.budget:
+                self._stats['budget_denied'] += 1
+                return False
+            self._stats['hedges'] += 1
+            return True
+
+    def hedge_won(self):
+        with self._lock:
+            self._stats['hedge_wins'] += 1
+
+    def stats(self):
+        """
+        对冲指标快照
+        :return: 字典（requests, hedges, hedge_wins, budget_denied, win_rate）
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['win_rate'] = stats['hedge_wins'] / stats['hedges'] if stats['hedges'] else 0.0
+        return stats
+
+    def close(self):
+        # ThreadPoolExecutor.shutdown的cancel_futures参数需要Python 3.9，这里逐个取消尚未开始的请求
+        with self._lock:
+            pending = list(self._inflight)
+        for future in pending:
+            future.cancel()
+        self._executor.shutdown(wait=False)
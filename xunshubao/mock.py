@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# 模拟循数宝接口，配合MockTransport在进程内测试，或由MockServer在本地提供HTTP服务
+
+import json
+import threading
+from urllib.parse import urlparse
+
+from .client import XunshubaoZxgkUtil
+
+
+def echo_responder(path, req_body):
+    """
+    默认应答：原样返回接口路径和解密后的请求参数
+    :return: 元组（code, msg, data）
+    """
+    return '0000', '', {'path': path, 'body': req_body}
+
+
+class MockApi:
+    """
+    模拟接口处理函数，可作为MockTransport的handler：
+    校验签名、解密请求参数，交由responder生成结果，再按请求的加密方式加密返回
+    """
+
+    def __init__(self, appKey, signSecretKey, sm4SecretKey, aesSecretKey, responder=echo_responder):
+        """
+        :param responder: 应答函数 responder(path, req_body)，返回元组（code, msg, data），data为空时不返回数据
+        """
+        # 复用客户端的签名与加解密实现，服务端不发起请求，无需传输层
+        self._util = XunshubaoZxgkUtil(appKey, signSecretKey, sm4SecretKey, aesSecretKey)
+        self.responder = responder
+
+    def __call__(self, url, post_data):
+        req_header = post_data['requestHeader']
+        encryption = req_header.get('encryption') or 'SM4'
+        req_body_str = self._util.decrypt_body(encryption, post_data['requestBody'])
+        try:
+            token = self._util.sign(req_header.get('signType') or 'SM3', req_header['timestamp'], req_body_str)
+        except ValueError:
+            token = None
+        if req_header['appKey'] != self._util.appKey or req_header['token'] != token:
+            return 200, {'code': '1001', 'msg': '签名错误', 'requestId': req_header.get('requestId')}
+
+        code, msg, data = self.responder(urlparse(url).path, json.loads(req_body_str))
+        resp = {'code': code, 'msg': msg, 'requestId': req_header.get('requestId')}
+        if data is not None:
+            resp['data'] = self._util.encrypt_body(encryption, json.dumps(data))
+        return 200, resp
+
+
+class MockServer:
+    """
+    本地HTTP模拟服务，在后台线程中用MockApi应答，用于需要真实网络往返的测试和剖析
+    """
+
+    def __init__(self, api: MockApi, host='127.0.0.1', port=0):
+        """
+        :param api: 模拟接口处理函数
+        :param host: 监听地址
+        :param port: 监听端口，为0时自动分配
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                post_data = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                status_code, content = api(self.path, post_data)
+                if not isinstance(content, bytes):
+                    content = json.dumps(content).encode('utf-8')
+                self.send_response(status_code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            # 默认监听队列只有5，大量线程同时建连时会被重置
+            request_queue_size = 128
+
+        self._server = Server((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='xunshubao-mock-server',
+                                        daemon=True)
+        self._thread.start()
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return 'http://%s:%s' % (host, port)
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# 无结果过滤器：用按时间分代的布隆过滤器记录近期核验无结果的查询对象，复查时可在本地直接应答
+# 每个查询对象只占十几个比特，千万级对象也只需几十MB内存，可保存到文件供下次运行使用
+
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+
+_FILE_MAGIC = b'XSBNEG1\n'
+# 未提供answer_factory时本地应答的返回代码，与服务端返回的代码区分，调用方据此识别本地应答
+LOCAL_CLEAN_CODE = 'LOCAL_CLEAN'
+
+
+class _BloomGeneration:
+    """
+    一代布隆过滤器，记录开始时间之后加入的查询对象
+    """
+
+    def __init__(self, start, num_bits, num_hashes, bits=None):
+        self.start = start
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+
+    def _positions(self, digest):
+        # 双重哈希：第i个位置为 h1 + i*h2
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, digest):
+        bits = self.bits
+        for position in self._positions(digest):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, digest):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+
+class NegativeResultFilter:
+    """
+    核验无结果过滤器，设置为XunshubaoZxgkUtil.negative_filter后作用于核验接口
+    按接口类别（如shixincheck/person）分别记录核验无结果的查询条件；每bucket_seconds开启新的一代，
+    只保留最近generations代。再次核验max_age秒内记录过的查询条件时不发请求，直接在本地应答。
+    过滤器只记录查询条件的摘要，不保存任何应答报文：本地应答由answer_factory按查询条件生成，
+    未提供时返回代码为LOCAL_CLEAN_CODE、result为空的应答。
+    布隆过滤器存在误判（按error_rate），误判的查询对象会被当作无结果，对漏报敏感的类别不宜使用。
+    """
+
+    def __init__(self, is_clean, capacity=1000000, error_rate=0.001, bucket_seconds=86400, generations=7,
+                 max_age=None, answer_factory=None):
+        """
+        :param is_clean: 判断函数 is_clean(category, result)，result为解密后的返回报文，无结果时返回True
+        :param capacity: 每个类别每一代预计记录的查询对象数
+        :param error_rate: 达到capacity时的误判率
+        :param bucket_seconds: 每一代覆盖的时间（秒）
+        :param generations: 保留的代数
+        :param max_age: 记录的有效期（秒），为空时为bucket_seconds * generations
+        :param answer_factory: 本地应答函数 answer_factory(category, search_form)，返回元组（msg, result），
+                               result只能由查询条件生成，本地应答的返回代码为0000；为空时使用LOCAL_CLEAN_CODE
+        """
+        self.is_clean = is_clean
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bucket_seconds = bucket_seconds
+        self.generations = generations
+        self.max_age = max_age if max_age is not None else bucket_seconds * generations
+        self.answer_factory = answer_factory
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self._lock = threading.Lock()
+        # 类别 -> 按时间从旧到新排列的各代过滤器
+        self._categories = {}
+        self._stats = {'added': 0, 'hits': 0, 'misses': 0}
+
+    @staticmethod
+    def subject_key(search_form):
+        """
+        查询对象的摘要，由除翻页字段以外的查询条件计算
+        """
+        text = json.dumps(search_form.static_fields(), ensure_ascii=False)
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def _current(self, category, now):
+        """
+        类别当前的一代，到期时开启新的一代并淘汰超出保留代数的旧代，调用方需持有锁
+        """
+        gens = self._categories.get(category)
+        if gens is None:
+            gens = self._categories[category] = []
+        if not gens or now - gens[-1].start >= self.bucket_seconds:
+            gens.append(_BloomGeneration(now, self.num_bits, self.num_hashes))
+            del gens[:-self.generations]
+        return gens[-1]
+
+    def add(self, category, search_form, now=None):
+        """
+        记录一次无结果的核验
+        :param category: 接口类别
+        :param search_form: 查询条件
+        :param now: 当前时间，为空时取time.time()
+        """
+        digest = self.subject_key(search_form)
+        now = time.time() if now is None else now
+        with self._lock:
+            self._current(category, now).add(digest)
+            self._stats['added'] += 1
+
+    def age(self, category, search_form, now=None):
+        """
+        查询对象最近一次记录为无结果距今的时间上限（秒），按所在代的开始时间计算
+        :return: 秒数，未记录时返回None
+        """
+        digest = self.subject_key(search_form)
+        now = time.time() if now is None else now
+        with self._lock:
+            for gen in reversed(self._categories.get(category, ())):
+                if now - gen.start > self.bucket_seconds * self.generations:
+                    break
+                if digest in gen:
+                    return now - gen.start
+        return None
+
+    def recently_clean(self, category, search_form, max_age=None, now=None):
+        """
+        查询对象是否在max_age秒内核验无结果，可用于批量任务中推迟复查
+        :param max_age: 有效期（秒），为空时使用过滤器的max_age
+        """
+        age = self.age(category, search_form, now)
+        return age is not None and age <= (self.max_age if max_age is None else max_age)
+
+    def lookup(self, category, search_form, now=None):
+        """
+        本地应答
+        :return: 有效期内记录过时返回元组（code, msg, result），否则返回None
+        """
+        hit = self.recently_clean(category, search_form, now=now)
+        with self._lock:
+            self._stats['hits' if hit else 'misses'] += 1
+        if not hit:
+            return None
+        if self.answer_factory is None:
+            return LOCAL_CLEAN_CODE, '近期核验无结果', None
+        msg, result = self.answer_factory(category, search_form)
+        return '0000', msg, result
+
+    def stats(self):
+        """
+        记录、命中、未命中计数，以及各类别的代数和占用内存
+        """
+        with self._lock:
+            return dict(self._stats, categories={
+                category: {'generations': len(gens), 'bytes': sum(len(gen.bits) for gen in gens)}
+                for category, gens in self._categories.items()})
+
+    def save(self, path):
+        """
+        保存到文件，先写临时文件再替换，写入中断不会损坏已有文件
+        """
+        with self._lock:
+            header = {
+                'capacity': self.capacity, 'error_rate': self.error_rate, 'bucket_seconds': self.bucket_seconds,
+                'generations': self.generations, 'max_age': self.max_age, 'num_bits': self.num_bits,
+                'num_hashes': self.num_hashes,
+                'categories': {category: [gen.start for gen in gens] for category, gens in self._categories.items()},
+            }
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(_FILE_MAGIC)
+                f.write(json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n')
+                for gens in self._categories.values():
+                    for gen in gens:
+                        f.write(gen.bits)
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, is_clean, answer_factory=None):
+        """
+        从文件加载
+        :param path: save()保存的文件
+        :param is_clean: 判断函数，同构造函数
+        :param answer_factory: 本地应答函数，同构造函数
+        :return: NegativeResultFilter
+        """
+        with open(path, 'rb') as f:
+            if f.readline() != _FILE_MAGIC:
+                raise ValueError('不是无结果过滤器文件：%s' % path)
+            header = json.loads(f.readline().decode('utf-8'))
+            negative_filter = cls(is_clean, header['capacity'], header['error_rate'], header['bucket_seconds'],
+                                  header['generations'], header['max_age'], answer_factory)
+            num_bits, num_hashes = header['num_bits'], header['num_hashes']
+            negative_filter.num_bits, negative_filter.num_hashes = num_bits, num_hashes
+            size = (num_bits + 7) // 8
+            for category, starts in header['categories'].items():
+                negative_filter._categories[category] = [
+                    _BloomGeneration(start, num_bits, num_hashes, bytearray(f.read(size))) for start in starts]
+        return negative_filter
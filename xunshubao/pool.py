@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+# 多账号池：按额度和健康度在多个appKey之间分配请求，被限流或拒绝时自动切换账号
+
+import functools
+import logging
+import threading
+import time
+
+from .client import XunshubaoZxgkUtil, ENDPOINT_METHODS
+from .transport import RequestsTransport
+
+
+class XunshubaoCredential:
+    """
+    账号凭证及其额度配置
+    """
+
+    def __init__(self, appKey, signSecretKey, sm4SecretKey, aesSecretKey, weight=1, rate=None, burst=None):
+        """
+        :param appKey: 用户标识
+        :param signSecretKey: 签名密钥
+        :param sm4SecretKey: SM4密钥
+        :param aesSecretKey: AES密钥
+        :param weight: 分配权重，一般按账号额度设置
+        :param rate: 每秒最多请求数，为空时不限速
+        :param burst: 令牌桶容量，为空时等于rate
+        """
+        self.appKey = appKey
+        self.signSecretKey = signSecretKey
+        self.sm4SecretKey = sm4SecretKey
+        self.aesSecretKey = aesSecretKey
+        self.weight = weight
+        self.rate = rate
+        self.burst = burst
+
+
+class RateLimiter:
+    """
+    令牌桶限速器，调用方需自行加锁
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        :param rate: 每秒补充的令牌数，为空时不限速
+        :param burst: 令牌桶容量，为空时等于rate
+        """
+        self.rate = rate
+        self.capacity = burst if burst is not None else (max(rate, 1) if rate else None)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        if self.rate:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def try_acquire(self, now):
+        """
+        尝试取一个令牌
+        :return: 取到返回True
+        """
+        if not self.rate:
+            return True
+        self._refill(now)
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def wait_time(self, now):
+        """
+        距离下一个令牌可用的时间（秒）
+        """
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+
+class _PoolMember:
+    """
+    账号池成员：每个账号独立的客户端（签名前缀、加解密器缓存）、限速器和健康状态
+    """
+
+    def __init__(self, credential: XunshubaoCredential, util: XunshubaoZxgkUtil):
+        self.credential = credential
+        self.util = util
+        self.limiter = RateLimiter(credential.rate, credential.burst)
+        # 健康度，(0, 1]，失败时减半，成功时逐步恢复
+        self.health = 1.0
+        # 冷却截止时间，被限流或拒绝后在此之前不再分配
+        self.cooldown_until = 0.0
+        # 平滑加权轮询的当前权重
+        self.current_weight = 0.0
+        self.stats = {'requests': 0, 'success': 0, 'failure': 0, 'error': 0, 'rejected': 0}
+
+
+class XunshubaoZxgkPool:
+    """
+    多账号客户端池
+    提供与XunshubaoZxgkUtil相同的接口方法，每次调用按权重×健康度以平滑加权轮询选择账号，并遵守各账号的限速；
+    返回failover_codes中的错误代码时，该账号进入冷却，请求自动改用其他账号重试。
+    """
+
+    def __init__(self, credentials, transport=None, pool_maxsize=64, failover_codes=(), cooldown=30.0,
+                 max_wait=None):
+        """
+        :param credentials: 账号凭证（XunshubaoCredential）列表
+        :param transport: 各账号共享的传输层，为空时创建RequestsTransport
+        :param pool_maxsize: 默认传输层的连接池最大连接数
+        :param failover_codes: 表示账号被限流、额度不足或被拒绝的错误代码（见接口文档附录A），返回这些代码时切换账号
+        :param cooldown: 账号被限流或拒绝后的冷却时间（秒）
+        :param max_wait: 所有账号都不可用时最多等待的时间（秒），为空时一直等待
+        """
+        if not credentials:
+            raise ValueError('至少需要一个账号')
+        self.transport = transport if transport is not None else RequestsTransport(pool_maxsize)
+        self.failover_codes = frozenset(failover_codes)
+        self.cooldown = cooldown
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._members = [_PoolMember(credential, XunshubaoZxgkUtil(
+            credential.appKey, credential.signSecretKey, credential.sm4SecretKey, credential.aesSecretKey,
+            transport=self.transport)) for credential in credentials]
+
+    @property
+    def utils(self):
+        """
+        各账号的客户端，可用于统一设置timeout、hedge_policy等
+        """
+        return [member.util for member in self._members]
+
+    def __getattr__(self, name):
+        if name in ENDPOINT_METHODS:
+            return functools.partial(self.call, name)
+        raise AttributeError(name)
+
+    def call(self, method, *args, **kwargs):
+        """
+        选择账号调用接口方法，被限流或拒绝时改用其他账号重试，每个账号最多尝试一次
+        :param method: 接口方法名，如zxgk_check_for_company
+        :return:元组（code, msg, result）
+        """
+        tried = set()
+        result = "9999", "没有可用的账号", None
+        while len(tried) < len(self._members):
+            member = self._acquire(tried)
+            if member is None:
+                break
+            tried.add(id(member))
+            result = getattr(member.util, method)(*args, **kwargs)
+            if not self._report(member, result[0]):
+                return result
+            logging.warning('账号%s返回错误代码%s，切换账号重试' % (member.credential.appKey, result[0]))
+        return result
+
+    def _acquire(self, tried):
+        """
+        按平滑加权轮询选择一个未尝试过、不在冷却期且有令牌的账号，都没有令牌时等待
+        :return: _PoolMember，没有可用账号时返回None
+        """
+        deadline = None if self.max_wait is None else time.monotonic() + self.max_wait
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                candidates = [member for member in self._members if id(member) not in tried]
+                if not candidates:
+                    return None
+                ready = [member for member in candidates if member.cooldown_until <= now]
+                total = 0.0
+                chosen = None
+                for member in ready:
+                    if member.limiter.wait_time(now) > 0:
+                        continue
+                    member.current_weight += member.credential.weight * member.health
+                    total += member.credential.weight * member.health
+                    if chosen is None or member.current_weight > chosen.current_weight:
+                        chosen = member
+                if chosen is not None:
+                    chosen.current_weight -= total
+                    chosen.limiter.try_acquire(now)
+                    chosen.stats['requests'] += 1
+                    return chosen
+                # 等待最早恢复的账号：冷却结束或补充令牌
+                wait = min(max(member.cooldown_until - now, 0.0) + member.limiter.wait_time(now)
+                           for member in candidates)
+            if deadline is not None:
+                if time.monotonic() + wait > deadline:
+                    return None
+            time.sleep(max(wait, 0.001))
+
+    def _report(self, member, code):
+        """
+        记录调用结果，更新健康度
+        :return: 需要切换账号时返回True
+        """
+        with self._lock:
+            if code in self.failover_codes:
+                member.stats['rejected'] += 1
+                member.health = max(member.health / 2, 0.05)
+                member.cooldown_until = time.monotonic() + self.cooldown
+                return True
+            if code == '0000':
+                member.stats['success'] += 1
+                member.health = min(1.0, member.health + 0.1)
+            elif code == '9999':
+                member.stats['error'] += 1
+                member.health = max(member.health / 2, 0.05)
+            else:
+                member.stats['failure'] += 1
+            return False
+
+    def stats(self):
+        """
+        各账号的调用计数和健康状态
+        :return: 以appKey为键的字典
+        """
+        with self._lock:
+            now = time.monotonic()
+            return {member.credential.appKey: dict(member.stats, health=member.health,
+                                                   cooling=member.cooldown_until > now)
+                    for member in self._members}
+
+    def close(self):
+        self.transport.close()
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+# 分阶段延迟剖析：记录每次调用在签名、加密、DNS、建连、TLS、服务端处理、下载、解析、解密各阶段的耗时，
+# 输出各阶段分位数和火焰图工具（flamegraph.pl、speedscope等）可读取的折叠栈
+
+import contextlib
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+from .transport import Transport, TransportResponse
+
+
+class PhaseProfiler:
+    """
+    阶段耗时记录器，设置为XunshubaoZxgkUtil.profiler后记录每次调用的各阶段耗时
+    阶段可以嵌套，嵌套阶段以分号连接成路径，如 request;dns。
+    对冲请求在其他线程中执行，剖析时建议不配置hedge_policy；流式模式只记录到开始解密为止。
+    """
+
+    def __init__(self, max_samples=100000):
+        """
+        :param max_samples: 最多保留的调用记录数
+        """
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # 每次调用的记录：（接口名称, {阶段路径: 耗时秒数}）
+        self._samples = []
+
+    @contextlib.contextmanager
+    def sample(self, api_name):
+        """
+        记录一次调用，其中的phase()计入这次调用
+        """
+        self._local.phases = phases = {}
+        self._local.stack = []
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            phases[''] = time.perf_counter() - start
+            self._local.phases = None
+            with self._lock:
+                if len(self._samples) < self.max_samples:
+                    self._samples.append((api_name, phases))
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        记录一个阶段的耗时，不在sample()中时不记录
+        """
+        phases = getattr(self._local, 'phases', None)
+        if phases is None:
+            yield
+            return
+        stack = self._local.stack
+        stack.append(name)
+        path = ';'.join(stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            phases[path] = phases.get(path, 0.0) + time.perf_counter() - start
+            stack.pop()
+
+    def samples(self):
+        with self._lock:
+            return list(self._samples)
+
+    def percentiles(self, percentiles=(50, 90, 99)):
+        """
+        各接口各阶段耗时的分位数（毫秒），未出现某阶段的调用按0计，总耗时的阶段路径为total
+        :return: 字典 {接口名称: {阶段路径: {'p50': 毫秒, ...}}}
+        """
+        grouped = {}
+        for api_name, phases in self.samples():
+            grouped.setdefault(api_name, []).append(phases)
+        report = {}
+        for api_name, samples in grouped.items():
+            paths = sorted({path for phases in samples for path in phases})
+            report[api_name] = {}
+            for path in paths:
+                values = sorted(phases.get(path, 0.0) for phases in samples)
+                report[api_name][path or 'total'] = {
+                    'p%s' % p: round(values[min(len(values) - 1, int(len(values) * p / 100))] * 1000, 3)
+                    for p in percentiles}
+        return report
+
+    def collapsed_stacks(self):
+        """
+        折叠栈：每行为“接口名称;阶段;子阶段 微秒数”，数值为该路径扣除子阶段后的自身耗时之和
+        未归入任何阶段的耗时记为 接口名称;other
+        """
+        totals = {}
+        for api_name, phases in self.samples():
+            # 各路径下直接子阶段的耗时之和
+            children = {}
+            for path, seconds in phases.items():
+                if path:
+                    parent = path.rsplit(';', 1)[0] if ';' in path else ''
+                    children[parent] = children.get(parent, 0.0) + seconds
+            for path, seconds in phases.items():
+                stack = api_name + ';' + path if path else api_name + ';other'
+                totals[stack] = totals.get(stack, 0.0) + max(seconds - children.get(path, 0.0), 0.0)
+        return ['%s %d' % (stack, round(seconds * 1e6)) for stack, seconds in sorted(totals.items())
+                if seconds > 0]
+
+    def write_report(self, prefix, percentiles=(50, 90, 99)):
+        """
+        写出剖析结果：prefix.json（分位数）和prefix.folded（折叠栈）
+        """
+        with open(prefix + '.json', 'w', encoding='utf-8') as f:
+            json.dump(self.percentiles(percentiles), f, ensure_ascii=False, indent=2)
+        with open(prefix + '.folded', 'w', encoding='utf-8') as f:
+            for line in self.collapsed_stacks():
+                f.write(line + '\n')
+
+
+class ProfilingTransport(Transport):
+    """
+    可分阶段计时的传输层，基于标准库http.client
+    把请求拆成 dns、connect、tls、send、server（等待响应头）、download 几个阶段记入剖析器。
+    默认每次请求新建连接，以便测量DNS和TLS；reuse_connections为True时每个线程复用一个连接。
+    """
+
+    def __init__(self, profiler: PhaseProfiler, base_url=None, reuse_connections=False, ssl_context=None):
+        """
+        :param profiler: 阶段耗时记录器
+        :param base_url: 替换请求地址中的协议和主机，如 http://127.0.0.1:8080，用于访问本地模拟服务
+        :param reuse_connections: 是否在线程内复用连接
+        :param ssl_context: HTTPS使用的ssl.SSLContext，为空时使用默认配置
+        """
+        self.profiler = profiler
+        self.base_url = base_url.rstrip('/') if base_url else None
+        self.reuse_connections = reuse_connections
+        self._ssl_context = ssl_context
+        self._local = threading.local()
+
+    def _connect(self, scheme, host, port, timeout):
+        import http.client
+        import socket
+        phase = self.profiler.phase
+        with phase('dns'):
+            family, socktype, proto, _, address = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0]
+        with phase('connect'):
+            sock = socket.socket(family, socktype, proto)
+            sock.settimeout(timeout)
+            # 与http.client一致关闭Nagle算法，请求头和请求体分开发送时不被延迟确认拖慢
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.connect(address)
+        if scheme == 'https':
+            with phase('tls'):
+                if self._ssl_context is None:
+                    import ssl
+                    self._ssl_context = ssl.create_default_context()
+                sock = self._ssl_context.wrap_socket(sock, server_hostname=host)
+        conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        conn.sock = sock
+        return conn
+
+    def post(self, url, data, headers, timeout):
+        if self.base_url is not None:
+            parts = urlsplit(url)
+            url = self.base_url + parts.path + ('?' + parts.query if parts.query else '')
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        conn = getattr(self._local, 'connections', {}).get(key) if self.reuse_connections else None
+        if conn is None:
+            conn = self._connect(parts.scheme, parts.hostname, port, timeout)
+        phase = self.profiler.phase
+        try:
+            with phase('send'):
+                conn.request('POST', parts.path or '/', body=data, headers=headers)
+            with phase('server'):
+                resp = conn.getresponse()
+            with phase('download'):
+                content = resp.read()
+        except Exception:
+            conn.close()
+            getattr(self._local, 'connections', {}).pop(key, None)
+            raise
+        if self.reuse_connections and not resp.will_close:
+            if not hasattr(self._local, 'connections'):
+                self._local.connections = {}
+            self._local.connections[key] = conn
+        else:
+            conn.close()
+        return TransportResponse(resp.status, content, dict(resp.getheaders()))
+
+
+def run_profile(util, method, make_args, repeat=100, concurrency=1):
+    """
+    重复调用接口方法并记录各阶段耗时
+    :param util: XunshubaoZxgkUtil，需已设置profiler
+    :param method: 接口方法名
+    :param make_args: 函数 make_args()，返回一次调用的参数列表（如每次使用新的requestId）
+    :param repeat: 调用次数
+    :param concurrency: 并发线程数
+    :return: 各返回码的次数
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def call(_):
+        return getattr(util, method)(*make_args())[0]
+
+    codes = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for code in executor.map(call, range(repeat)):
+            codes[code] = codes.get(code, 0) + 1
+    return codes
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+# 请求调度：按优先级类别加权公平排队，限制总并发，过期请求直接丢弃
+
+import contextlib
+import contextvars
+import threading
+import time
+from collections import deque
+
+from .stream import DecryptedRecordStream
+
+
+class PriorityClass:
+    """
+    优先级类别
+    """
+
+    def __init__(self, name, weight=1, reserved=0, default_timeout=None):
+        """
+        :param name: 类别名称，如interactive、bulk
+        :param weight: 加权公平排队的权重，权重越大分到的并发份额越多
+        :param reserved: 为该类别预留的并发数，其他类别不能占用
+        :param default_timeout: 默认排队截止时间（秒），超过仍未发出的请求被丢弃，为空时不丢弃
+        """
+        self.name = name
+        self.weight = weight
+        self.reserved = reserved
+        self.default_timeout = default_timeout
+
+
+class _Waiter:
+    """
+    排队中的请求
+    """
+
+    def __init__(self, tag, deadline):
+        self.tag = tag
+        self.deadline = deadline
+        self.granted = False
+        self.event = threading.Event()
+
+
+class _ClassState:
+    """
+    类别的队列和计数
+    """
+
+    def __init__(self, priority_class: PriorityClass):
+        self.priority_class = priority_class
+        self.queue = deque()
+        self.last_tag = 0.0
+        self.running = 0
+        self.stats = {'dispatched': 0, 'dropped': 0, 'wait_seconds': 0.0}
+
+
+class RequestScheduler:
+    """
+    请求调度器，设置为XunshubaoZxgkUtil.scheduler后作用于所有接口方法
+    各类别按虚拟完成时间（加权公平排队）依次获得并发名额，预留名额只供本类别使用；
+    请求在截止时间前未获得名额则不再发送，返回9999。
+    调用方用 with scheduler.use('bulk'): 指定其中调用所属的类别。
+    流式调用在结果读完或关闭前一直占用名额，调用方须读完或关闭返回的DecryptedRecordStream。
+    """
+
+    def __init__(self, max_concurrency, classes, default_class=None):
+        """
+        :param max_concurrency: 最大并发请求数
+        :param classes: 优先级类别（PriorityClass）列表
+        :param default_class: 未指定类别时使用的类别名称，为空时取第一个类别
+        """
+        if sum(priority_class.reserved for priority_class in classes) > max_concurrency:
+            raise ValueError('预留并发数之和超过最大并发数')
+        self.max_concurrency = max_concurrency
+        self.default_class = default_class if default_class is not None else classes[0].name
+        self._classes = {priority_class.name: _ClassState(priority_class) for priority_class in classes}
+        self._shared_capacity = max_concurrency - sum(priority_class.reserved for priority_class in classes)
+        self._lock = threading.Lock()
+        self._running = 0
+        self._vtime = 0.0
+        self._context = contextvars.ContextVar('xunshubao_priority', default=None)
+
+    @contextlib.contextmanager
+    def use(self, name, timeout=None):
+        """
+        指定当前上下文中请求所属的类别
+        :param name: 类别名称
+        :param timeout: 排队截止时间（秒），为空时使用类别的default_timeout
+        """
+        if name not in self._classes:
+            raise ValueError('未知的优先级类别：%s' % name)
+        token = self._context.set((name, timeout))
+        try:
+            yield
+        finally:
+            self._context.reset(token)
+
+    def run(self, fn, *args, **kwargs):
+        """
+        排队获得并发名额后执行fn
+        流式结果（DecryptedRecordStream）返回时数据仍在下载，读完或关闭结果时才归还名额
+        :return: fn的返回值；超过截止时间未获得名额时返回元组（"9999", msg, None）
+        """
+        name, timeout = self._context.get() or (self.default_class, None)
+        state = self._classes[name]
+        if timeout is None:
+            timeout = state.priority_class.default_timeout
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        waiter = self._enqueue(state, deadline)
+        if not self._wait(state, waiter):
+            return "9999", "排队超过截止时间，请求未发送", None
+        with self._lock:
+            state.stats['wait_seconds'] += time.monotonic() - start
+        deferred = False
+        try:
+            result = fn(*args, **kwargs)
+            if isinstance(result, tuple) and len(result) == 3 and isinstance(result[2], DecryptedRecordStream):
+                result[2].add_close_callback(lambda: self._release(state))
+                deferred = True
+            return result
+        finally:
+            if not deferred:
+                self._release(state)
+
+    def _release(self, state):
+        """
+        归还并发名额并唤醒下一个排队的请求
+        """
+        with self._lock:
+            state.running -= 1
+            self._running -= 1
+            self._dispatch()
+
+    def _enqueue(self, state, deadline):
+        with self._lock:
+            tag = max(self._vtime, state.last_tag) + 1.0 / state.priority_class.weight
+            state.last_tag = tag
+            waiter = _Waiter(tag, deadline)
+            state.queue.append(waiter)
+            self._dispatch()
+            return waiter
+
+    def _wait(self, state, waiter):
+        """
+        等待名额，超过截止时间时从队列中移除
+        :return: 获得名额返回True
+        """
+        while True:
+            remaining = None if waiter.deadline is None else waiter.deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                with self._lock:
+                    if waiter.event.is_set():
+                        return waiter.granted
+                    state.queue.remove(waiter)
+                    state.stats['dropped'] += 1
+                    return False
+            if waiter.event.wait(remaining):
+                return waiter.granted
+
+    def _can_run(self, state):
+        """
+        类别是否还能获得名额：优先使用本类别的预留名额，其次使用共享名额
+        """
+        if state.running < state.priority_class.reserved:
+            return True
+        shared_in_use = sum(max(0, other.running - other.priority_class.reserved)
+                            for other in self._classes.values())
+        return shared_in_use < self._shared_capacity
+
+    def _dispatch(self):
+        """
+        把空闲名额分给虚拟完成时间最小的队首请求，调用方需持有锁
+        """
+        now = time.monotonic()
+        while self._running < self.max_concurrency:
+            best = None
+            for state in self._classes.values():
+                if state.queue and (best is None or state.queue[0].tag < best.queue[0].tag) \
+                        and self._can_run(state):
+                    best = state
+            if best is None:
+                return
+            waiter = best.queue.popleft()
+            if waiter.deadline is not None and waiter.deadline <= now:
+                best.stats['dropped'] += 1
+                waiter.event.set()
+                continue
+            self._vtime = waiter.tag
+            best.running += 1
+            best.stats['dispatched'] += 1
+            self._running += 1
+            waiter.granted = True
+            waiter.event.set()
+
+    def stats(self):
+        """
+        各类别的排队、执行和丢弃计数
+        :return: 以类别名称为键的字典
+        """
+        with self._lock:
+            return {name: dict(state.stats, queued=len(state.queue), running=state.running)
+                    for name, state in self._classes.items()}
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+# 请求/应答落盘：按段追加写入已签名的请求和解密后的应答，进程崩溃后已付费的结果不必重新查询
+# 段文件名为该段第一条记录的序号；每条记录为 长度(4字节) + CRC32(4字节) + JSON，均为小端序
+
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+_HEADER = struct.Struct('<II')
+_SEGMENT_SUFFIX = '.seg'
+
+
+def _segments(directory):
+    """
+    目录中的段文件，按起始序号排序
+    :return: 列表[(起始序号, 路径)]
+    """
+    segments = []
+    for filename in os.listdir(directory):
+        if filename.endswith(_SEGMENT_SUFFIX) and filename[:-len(_SEGMENT_SUFFIX)].isdigit():
+            segments.append((int(filename[:-len(_SEGMENT_SUFFIX)]), os.path.join(directory, filename)))
+    segments.sort()
+    return segments
+
+
+def _read_records(f):
+    """
+    从当前位置读取完整有效的记录，遇到不完整或校验失败的记录时停止
+    :return: 生成器，逐条产出（记录结束位置, 记录JSON字节）
+    """
+    while True:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return
+        length, crc = _HEADER.unpack(header)
+        data = f.read(length)
+        if len(data) < length or zlib.crc32(data) != crc:
+            return
+        yield f.tell(), data
+
+
+class Spool:
+    """
+    追加写入的分段日志
+    每条记录写入后立即刷新到操作系统，进程崩溃不会丢失；fsync按条数或时间间隔批量执行，
+    断电时最多丢失最近一个间隔内的记录。打开时截断最后一段末尾不完整的记录。
+    同一目录只能由一个Spool写入，多进程时请为每个进程使用单独的目录。
+    """
+
+    def __init__(self, directory, segment_bytes=64 * 1024 * 1024, fsync_every=100, fsync_interval=1.0):
+        """
+        :param directory: 存放段文件的目录，不存在时创建
+        :param segment_bytes: 段文件大小上限（字节），超过后开始新的一段
+        :param fsync_every: 累计多少条未同步记录时立即fsync
+        :param fsync_interval: 后台fsync的时间间隔（秒）
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._file = None
+        self._next_seq = 0
+        self._recover()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._sync_loop, name='xunshubao-spool', daemon=True)
+        self._thread.start()
+
+    def _recover(self):
+        """
+        找到最后一段的有效结尾，截断不完整的记录，继续在该段追加
+        """
+        segments = _segments(self.directory)
+        if not segments:
+            self._open_segment(0)
+            return
+        start_seq, path = segments[-1]
+        count, end = 0, 0
+        with open(path, 'rb') as f:
+            for end, _ in _read_records(f):
+                count += 1
+        if end != os.path.getsize(path):
+            with open(path, 'r+b') as f:
+                f.truncate(end)
+                os.fsync(f.fileno())
+        self._next_seq = start_seq + count
+        self._file = open(path, 'ab')
+
+    def _open_segment(self, start_seq):
+        self._file = open(os.path.join(self.directory, '%020d%s' % (start_seq, _SEGMENT_SUFFIX)), 'ab')
+        self._next_seq = start_seq
+
+    def append(self, record):
+        """
+        追加一条记录
+        :param record: 可JSON序列化的字典，写入时加上序号seq
+        :return: 记录的序号
+        """
+        with self._lock:
+            if self._file is None:
+                raise ValueError('Spool已关闭')
+            seq = self._next_seq
+            data = json.dumps(dict(record, seq=seq), ensure_ascii=False).encode('utf-8')
+            self._file.write(_HEADER.pack(len(data), zlib.crc32(data)) + data)
+            self._file.flush()
+            self._next_seq += 1
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every:
+                self._sync()
+            if self._file.tell() >= self.segment_bytes:
+                self._sync()
+                self._file.close()
+                self._open_segment(self._next_seq)
+            return seq
+
+    def _sync(self):
+        """
+        fsync当前段，调用方需持有锁
+        """
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def _sync_loop(self):
+        while not self._closed.wait(self.fsync_interval):
+            with self._lock:
+                if self._file is not None:
+                    self._sync()
+
+    def sync(self):
+        """
+        立即fsync尚未同步的记录
+        """
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+
+    def purge(self, position):
+        """
+        删除已全部消费的段
+        :param position: 读取位置（SpoolReader.position），该位置所在段之前的段被删除
+        :return: 删除的段数
+        """
+        removed = 0
+        for start_seq, path in _segments(self.directory)[:-1]:
+            if start_seq >= position[0]:
+                break
+            os.remove(path)
+            removed += 1
+        return removed
+
+    def close(self):
+        self._closed.set()
+        self._thread.join()
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class SpoolReader:
+    """
+    增量读取Spool，可与写入方同时运行
+    读取位置为（段起始序号, 段内偏移），可通过checkpoint文件保存，下次从上次提交的位置继续
+    """
+
+    def __init__(self, directory, position=None, checkpoint=None):
+        """
+        :param directory: Spool目录
+        :param position: 起始读取位置，为空时从checkpoint文件读取，没有checkpoint时从头读取
+        :param checkpoint: 保存读取位置的文件路径，为空时不保存
+        """
+        self.directory = directory
+        self.checkpoint = checkpoint
+        if position is None and checkpoint is not None and os.path.exists(checkpoint):
+            with open(checkpoint, 'r', encoding='utf-8') as f:
+                position = tuple(json.load(f))
+        self.position = position
+
+    def poll(self, max_records=None):
+        """
+        读取当前位置之后已完整写入的记录，并前移读取位置
+        :param max_records: 最多读取的记录数，为空时读到末尾
+        :return: 记录列表
+        """
+        records = []
+        segments = _segments(self.directory)
+        if self.position is None:
+            if not segments:
+                return records
+            self.position = (segments[0][0], 0)
+        for i, (start_seq, path) in enumerate(segments):
+            if start_seq < self.position[0]:
+                continue
+            if start_seq > self.position[0]:
+                self.position = (start_seq, 0)
+            with open(path, 'rb') as f:
+                f.seek(self.position[1])
+                for end, data in _read_records(f):
+                    records.append(json.loads(data))
+                    self.position = (start_seq, end)
+                    if max_records is not None and len(records) >= max_records:
+                        return records
+            if i == len(segments) - 1:
+                # 最后一段可能仍在写入，停在已完整写入的位置
+                break
+        return records
+
+    def __iter__(self):
+        """
+        读取到当前末尾为止的所有记录
+        """
+        while True:
+            records = self.poll(1000)
+            if not records:
+                return
+            for record in records:
+                yield record
+
+    def follow(self, interval=1.0):
+        """
+        持续读取新写入的记录，没有新记录时等待interval秒
+        """
+        while True:
+            records = self.poll(1000)
+            for record in records:
+                yield record
+            if not records:
+                time.sleep(interval)
+
+    def commit(self):
+        """
+        把当前读取位置保存到checkpoint文件
+        """
+        if self.checkpoint is None or self.position is None:
+            return
+        tmp_path = self.checkpoint + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(list(self.position), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint)
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+# 大报文流式处理：分块读取响应体，逐块base64解码、解密，并增量解析JSON逐条产出记录
+# 峰值内存只与分块大小和单条记录大小有关，与报文总大小无关
+
+import base64
+import codecs
+import json
+import re
+
+# 返回报文中加密数据的起始位置："data":"
+_DATA_START = re.compile(r'"data"\s*:\s*"')
+# 字符串外需要关注的结构字符
+_STRUCTURAL = re.compile(r'[\[\]{}",]')
+# 字符串内需要关注的字符
+_IN_STRING = re.compile(r'["\\]')
+
+
+class Base64StreamDecoder:
+    """
+    分块base64解码，不足4个字符的部分留到下一块
+    JSON字符串中的“/”可能被转义为“\\/”，转义符与“/”可能分在相邻两块中
+    """
+
+    def __init__(self):
+        self._pending = ''
+
+    def feed(self, text):
+        # 先与上一块留下的部分拼接再去除转义，被分块截断的转义符才能与“/”重新组合
+        text = (self._pending + text).replace('\\/', '/')
+        # 转义符可能被分块截断，留到下一块处理
+        if text.endswith('\\'):
+            text, self._pending = text[:-1], '\\'
+        else:
+            self._pending = ''
+        usable = len(text) // 4 * 4
+        self._pending = text[usable:] + self._pending
+        return base64.b64decode(text[:usable]) if usable else b''
+
+    def finish(self):
+        if self._pending:
+            raise ValueError('base64数据长度不正确')
+        return b''
+
+
+class BlockDecryptor:
+    """
+    ECB分组流式解密，始终保留最后一个分组，结束时去除PKCS#7填充
+    """
+
+    def __init__(self, decrypt_blocks, block_size=16):
+        """
+        :param decrypt_blocks: 解密函数，输入长度为分组整数倍的密文，返回不去填充的明文
+        :param block_size: 分组长度
+        """
+        self._decrypt_blocks = decrypt_blocks
+        self._block_size = block_size
+        self._pending = b''
+
+    def feed(self, data):
+        data = self._pending + data
+        # 至少保留一个完整分组，用于最后去除填充
+        usable = (len(data) - 1) // self._block_size * self._block_size if data else 0
+        self._pending = data[usable:]
+        return self._decrypt_blocks(data[:usable]) if usable else b''
+
+    def finish(self):
+        if len(self._pending) != self._block_size:
+            raise ValueError('密文长度不是分组长度的整数倍')
+        last = self._decrypt_blocks(self._pending)
+        padding_len = last[-1]
+        if not 0 < padding_len <= self._block_size or last[-padding_len:] != bytes([padding_len]) * padding_len:
+            raise ValueError('PKCS#7填充不正确')
+        return last[:-padding_len]
+
+
+class JsonRecordParser:
+    """
+    增量JSON解析：逐条产出记录数组中的元素
+    报文本身是数组时，记录即数组元素；是对象时，取records_key指定的数组成员（为空时取第一个数组成员）。
+    其余成员在结束后通过meta获取，其中记录数组替换为空数组。
+    """
+
+    def __init__(self, records_key=None):
+        """
+        :param records_key: 记录数组在顶层对象中的键名，为空时取第一个数组成员
+        """
+        self.records_key = records_key
+        self.meta = None
+        self._buf = ''
+        self._pos = 0
+        self._depth = 0
+        self._top_is_array = None
+        self._in_string = False
+        self._string_start = 0
+        self._last_key = None
+        # 记录数组内部的嵌套深度，不在记录数组中时为None
+        self._records_depth = None
+        self._records_done = False
+        self._item_start = 0
+        self._meta_parts = []
+        self._meta_from = 0
+
+    def feed(self, text):
+        """
+        输入一段文本
+        :return: 本段文本中完整解析出的记录列表
+        """
+        records = []
+        buf = self._buf + text
+        pos = self._pos
+        while True:
+            if self._in_string:
+                m = _IN_STRING.search(buf, pos)
+                if m is None:
+                    pos = len(buf)
+                    break
+                i = m.start()
+                if buf[i] == '\\':
+                    if i + 1 >= len(buf):
+                        pos = i
+                        break
+                    pos = i + 2
+                    continue
+                self._in_string = False
+                pos = i + 1
+                if self._depth == 1 and not self._top_is_array and self._records_depth is None:
+                    self._last_key = buf[self._string_start:pos]
+                continue
+
+            m = _STRUCTURAL.search(buf, pos)
+            if m is None:
+                pos = len(buf)
+                break
+            i = m.start()
+            c = buf[i]
+            pos = i + 1
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c == '[' or c == '{':
+                if self._depth == 0:
+                    self._top_is_array = c == '['
+                self._depth += 1
+                if c == '[' and self._is_records_array():
+                    self._meta_parts.append(buf[self._meta_from:pos])
+                    self._records_depth = self._depth
+                    self._item_start = pos
+            elif c == ']' or c == '}':
+                if self._records_depth == self._depth:
+                    self._emit(buf[self._item_start:i], records)
+                    self._records_depth = None
+                    self._records_done = True
+                    self._meta_from = i
+                self._depth -= 1
+            elif self._records_depth == self._depth:
+                # 记录数组中的逗号，分隔相邻两条记录
+                self._emit(buf[self._item_start:i], records)
+                self._item_start = pos
+
+        # 丢弃已处理的文本
+        if self._records_depth is not None:
+            keep_from = self._item_start
+        else:
+            keep_from = self._string_start if self._in_string else pos
+            self._meta_parts.append(buf[self._meta_from:keep_from])
+            self._meta_from = keep_from
+        self._buf = buf[keep_from:]
+        self._pos = pos - keep_from
+        self._item_start -= keep_from
+        self._meta_from -= keep_from
+        self._string_start -= keep_from
+        return records
+
+    def finish(self):
+        """
+        输入结束，解析除记录数组以外的其余成员
+        """
+        if self._depth or self._in_string:
+            raise ValueError('JSON报文不完整')
+        meta_text = (''.join(self._meta_parts) + self._buf[self._meta_from:]).strip()
+        self.meta = json.loads(meta_text) if meta_text else None
+        return []
+
+    def _is_records_array(self):
+        if self._records_done:
+            return False
+        if self._depth == 1:
+            return self._top_is_array
+        if self._depth == 2 and not self._top_is_array:
+            return self.records_key is None or json.loads(self._last_key) == self.records_key
+        return False
+
+    @staticmethod
+    def _emit(text, records):
+        text = text.strip()
+        if text:
+            records.append(json.loads(text))
+
+
+class DecryptedRecordStream:
+    """
+    返回数据的流式解密结果，迭代时逐条产出记录
+    迭代结束后可通过meta获取记录数组以外的其余成员
+    """
+
+    def __init__(self, text_chunks, decrypt_blocks, first_data_chunk='', records_key=None, on_close=None):
+        """
+        :param text_chunks: 响应体剩余文本的迭代器
+        :param decrypt_blocks: 分组解密函数
+        :param first_data_chunk: 已读取的加密数据开头部分
+        :param records_key: 记录数组的键名
+        :param on_close: 关闭时的回调，用于释放连接
+        """
+        self._text_chunks = text_chunks
+        self._pending_text = first_data_chunk
+        self._base64 = Base64StreamDecoder()
+        self._decryptor = BlockDecryptor(decrypt_blocks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._parser = JsonRecordParser(records_key)
+        self._on_close = on_close
+        # add_close_callback()追加的回调，在on_close之后执行
+        self._close_callbacks = []
+        self._closed = False
+
+    @property
+    def meta(self):
+        return self._parser.meta
+
+    def __iter__(self):
+        try:
+            text = self._pending_text
+            self._pending_text = ''
+            while True:
+                end = text.find('"')
+                data = text if end < 0 else text[:end]
+                plain = self._decryptor.feed(self._base64.feed(data))
+                for record in self._parser.feed(self._utf8.decode(plain)):
+                    yield record
+                if end >= 0:
+                    break
+                text = next(self._text_chunks, None)
+                if text is None:
+                    raise ValueError('返回报文不完整')
+            self._base64.finish()
+            plain = self._decryptor.finish()
+            for record in self._parser.feed(self._utf8.decode(plain, final=True)):
+                yield record
+            self._parser.finish()
+        finally:
+            self.close()
+
+    def add_close_callback(self, callback):
+        """
+        追加关闭时的回调，迭代结束或调用close()时执行；已关闭时立即执行
+        """
+        if self._closed:
+            callback()
+        else:
+            self._close_callbacks.append(callback)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            try:
+                if self._on_close is not None:
+                    self._on_close()
+            finally:
+                for callback in self._close_callbacks:
+                    callback()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def read_envelope(byte_chunks):
+    """
+    读取返回报文直到加密数据开始（或报文结束），解析code、msg等公共字段
+    要求公共字段位于data之前（与接口文档示例一致），否则退化为读取完整报文
+    :param byte_chunks: 响应体的字节块迭代器
+    :return: 元组（公共字段字典, 已读取的加密数据开头部分或None, 剩余文本块迭代器）
+    """
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    text_chunks = (utf8.decode(chunk) for chunk in byte_chunks)
+    head = ''
+    for text in text_chunks:
+        head += text
+        m = _DATA_START.search(head)
+        if m is not None:
+            envelope = json.loads(head[:m.end()] + '"}')
+            if 'code' in envelope:
+                return envelope, head[m.end():], text_chunks
+            # 公共字段在data之后，无法流式处理
+            head += ''.join(text_chunks)
+            break
+    envelope = json.loads(head + utf8.decode(b'', final=True))
+    return envelope, None, iter(())
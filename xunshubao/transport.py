@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+# 传输层：客户端只依赖 Transport 接口，具体实现可以替换
+# 各实现依赖的第三方库均在创建实例时才导入
+
+import json
+import threading
+
+
+class TransportResponse:
+    """
+    传输层响应
+    """
+
+    def __init__(self, status_code, content, headers=None):
+        """
+        :param status_code: HTTP状态码
+        :param content: 响应体（bytes）
+        :param headers: 响应头
+        """
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers if headers is not None else {}
+
+
+class TransportStreamResponse:
+    """
+    传输层流式响应，响应体通过iter_chunks()分块读取，读取完毕或放弃读取时需调用close()
+    """
+
+    def __init__(self, status_code, chunks, headers=None, on_close=None):
+        """
+        :param status_code: HTTP状态码
+        :param chunks: 响应体字节块迭代器
+        :param headers: 响应头
+        :param on_close: 关闭时的回调，用于释放连接
+        """
+        self.status_code = status_code
+        self.headers = headers if headers is not None else {}
+        self._chunks = chunks
+        self._on_close = on_close
+
+    def iter_chunks(self):
+        return self._chunks
+
+    def close(self):
+        if self._on_close is not None:
+            on_close, self._on_close = self._on_close, None
+            on_close()
+
+
+class Transport:
+    """
+    传输层接口，实现需保证可在多个线程间共享
+    """
+
+    def post(self, url, data, headers, timeout):
+        """
+        提交POST请求
+        :param url: 请求地址
+        :param data: 请求体（bytes）
+        :param headers: 请求头
+        :param timeout: 超时时间（秒）
+        :return: TransportResponse，网络异常直接抛出
+        """
+        raise NotImplementedError
+
+    def post_stream(self, url, data, headers, timeout, chunk_size):
+        """
+        提交POST请求，分块读取响应体
+        默认实现读取完整响应后再分块，支持流式读取的实现应覆盖此方法
+        :param chunk_size: 分块大小（字节）
+        :return: TransportStreamResponse，网络异常直接抛出
+        """
+        resp = self.post(url, data, headers, timeout)
+        content = resp.content
+        chunks = (content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
+        return TransportStreamResponse(resp.status_code, chunks, resp.headers)
+
+    def close(self):
+        """
+        释放连接等资源
+        """
+
+
+class RequestsTransport(Transport):
+    """
+    基于requests的传输层（默认）
+    各线程使用自己的Session，所有Session挂载同一个适配器，共享线程安全的urllib3连接池
+    """
+
+    def __init__(self, pool_maxsize=64):
+        """
+        :param pool_maxsize: 连接池最大连接数，建议不小于并发线程数
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        self._requests = requests
+        self._adapter = HTTPAdapter(pool_maxsize=pool_maxsize)
+        self._local = threading.local()
+
+    def _session(self):
+        """
+        当前线程的Session，挂载共享的连接池
+        """
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._requests.Session()
+            session.mount('https://', self._adapter)
+            session.mount('http://', self._adapter)
+            self._local.session = session
+        return session
+
+    def post(self, url, data, headers, timeout):
+        resp = self._session().post(url, data=data, headers=headers, timeout=timeout)
+        return TransportResponse(resp.status_code, resp.content, resp.headers)
+
+    def post_stream(self, url, data, headers, timeout, chunk_size):
+        resp = self._session().post(url, data=data, headers=headers, timeout=timeout, stream=True)
+        return TransportStreamResponse(resp.status_code, resp.iter_content(chunk_size), resp.headers, resp.close)
+
+    def close(self):
+        self._adapter.close()
+
+
+class Urllib3Transport(Transport):
+    """
+    直接基于urllib3的传输层，省去requests的Session/Request封装开销
+    """
+
+    def __init__(self, pool_maxsize=64):
+        """
+        :param pool_maxsize: 连接池最大连接数，建议不小于并发线程数
+        """
+        import urllib3
+        self._urllib3 = urllib3
+        self._pool = urllib3.PoolManager(maxsize=pool_maxsize, retries=False)
+
+    def post(self, url, data, headers, timeout):
+        resp = self._pool.request('POST', url, body=data, headers=headers,
+                                  timeout=self._urllib3.Timeout(total=timeout))
+        return TransportResponse(resp.status, resp.data, resp.headers)
+
+    def post_stream(self, url, data, headers, timeout, chunk_size):
+        resp = self._pool.request('POST', url, body=data, headers=headers,
+                                  timeout=self._urllib3.Timeout(total=timeout), preload_content=False)
+
+        def release():
+            # 读完剩余内容后连接才能放回连接池
+            resp.drain_conn()
+            resp.release_conn()
+
+        return TransportStreamResponse(resp.status, resp.stream(chunk_size), resp.headers, release)
+
+    def close(self):
+        self._pool.clear()
+
+
+class AsyncTransport(Transport):
+    """
+    基于aiohttp的异步传输层
+    后台线程运行一个事件循环，所有线程的请求都在这个循环上复用同一个连接池；
+    协程中可直接 await post_async()，同步代码调用 post() 时等待结果返回
+    """
+
+    def __init__(self, pool_maxsize=64):
+        """
+        :param pool_maxsize: 连接池最大连接数
+        """
+        import asyncio
+        import aiohttp
+        self._asyncio = asyncio
+        self._aiohttp = aiohttp
+        self._pool_maxsize = pool_maxsize
+        self._session = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='xunshubao-async-transport',
+                                        daemon=True)
+        self._thread.start()
+
+    async def post_async(self, url, data, headers, timeout):
+        """
+        post() 的协程版本，需在本传输层的事件循环中执行
+        """
+        if self._session is None:
+            connector = self._aiohttp.TCPConnector(limit=self._pool_maxsize)
+            self._session = self._aiohttp.ClientSession(connector=connector)
+        async with self._session.post(url, data=data, headers=headers,
+                                      timeout=self._aiohttp.ClientTimeout(total=timeout)) as resp:
+            content = await resp.read()
+            return TransportResponse(resp.status, content, resp.headers)
+
+    def post(self, url, data, headers, timeout):
+        future = self._asyncio.run_coroutine_threadsafe(self.post_async(url, data, headers, timeout), self._loop)
+        return future.result()
+
+    def close(self):
+        if self._session is not None:
+            self._asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+            self._session = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+class MockTransport(Transport):
+    """
+    进程内模拟传输层，不访问网络，用于测试
+    """
+
+    def __init__(self, handler):
+        """
+        :param handler: 处理函数 handler(url, post_data)，post_data为解析后的请求字典，
+                        返回（HTTP状态码, 响应字典或bytes）
+        """
+        self.handler = handler
+
+    def post(self, url, data, headers, timeout):
+        status_code, content = self.handler(url, json.loads(data))
+        if not isinstance(content, bytes):
+            content = json.dumps(content).encode('utf-8')
+        return TransportResponse(status_code, content, {'Content-Type': 'application/json'})